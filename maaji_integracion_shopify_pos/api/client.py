@@ -0,0 +1,182 @@
+"""
+Cliente HTTP compartido por los servicios API.
+
+Mantiene una sesión `requests.Session` por cada host, asi las conexiones TCP/TLS se reutilizan
+entre las peticiones, con reintentos y espera exponencial para los estados 429/5xx en los metodos
+idempotentes. Las peticiones POST solo se reintentan si el servicio las declara de lectura, por
+ejemplo, Dynamics 365, ver `READ_POST_ALLOWED_METHODS`. El tamaño del pool y los reintentos se
+configuran en `ConfigApiService`.
+
+`RateLimiter` limita las peticiones del cliente con un balde de tokens, las peticiones esperan
+su turno en lugar de fallar por el limite de la API.
+"""
+
+from typing import Mapping
+from time import monotonic, sleep
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from urllib.parse import urlsplit
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from ..config import Configuration, ConfigApiService
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Con limitador en el cliente el estado 429 lo maneja `RateLimiter`, no los reintentos.
+RATE_LIMITED_RETRY_STATUS_CODES = (500, 502, 503, 504)
+# Metodos que se reintentan, los servicios que consultan datos con POST, por ejemplo, el login y
+# los servicios de Dynamics 365, también reintentan POST.
+DEFAULT_ALLOWED_METHODS = Retry.DEFAULT_ALLOWED_METHODS
+READ_POST_ALLOWED_METHODS = Retry.DEFAULT_ALLOWED_METHODS | {"POST"}
+
+_sessions: dict[tuple[str, str, int, int, float, float, tuple[int, ...], frozenset[str]],
+                Session] = {}
+_sessions_lock = Lock()
+_rate_limiters: dict[tuple[str, float, int], "RateLimiter"] = {}
+_rate_limiters_lock = Lock()
+
+def create_session(config: ConfigApiService,
+                   /,
+                   retry_status_codes: tuple[int, ...] = RETRY_STATUS_CODES,
+                   allowed_methods: frozenset[str] = DEFAULT_ALLOWED_METHODS) -> Session:
+    """Crea la sesión HTTP con el pool de conexiones y los reintentos de la configuración."""
+    retries = Retry(
+        total=config.max_retries,
+        backoff_factor=config.backoff_factor,
+        backoff_jitter=config.backoff_jitter,
+        status_forcelist=retry_status_codes,
+        allowed_methods=allowed_methods,
+        respect_retry_after_header=True,
+        raise_on_status=False # Se devuelve la ultima respuesta, cada servicio valida el estado.
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.pool_size, max_retries=retries)
+    session = Session()
+    session.headers["Accept-Encoding"] = "gzip"
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session(url: str,
+                /,
+                retry_status_codes: tuple[int, ...] = RETRY_STATUS_CODES,
+                allowed_methods: frozenset[str] = DEFAULT_ALLOWED_METHODS) -> Session:
+    """
+    Devuelve la sesión HTTP del host de la URL, se crea una nueva si cambia la configuración.
+    """
+    url_split = urlsplit(url)
+    config = Configuration.api_service
+    key = (url_split.scheme, url_split.netloc, config.pool_size, config.max_retries,
+           config.backoff_factor, config.backoff_jitter, retry_status_codes,
+           frozenset(allowed_methods))
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = _sessions[key] = create_session(config, retry_status_codes,
+                                                          allowed_methods)
+    return session
+
+def close_sessions() -> None:
+    """Cierra todas las sesiones HTTP y sus conexiones."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+def parse_retry_after(value: str | None, /) -> float | None:
+    """Segundos de espera del encabezado `Retry-After`, en segundos o como fecha HTTP."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+
+class RateLimiter:
+    """
+    Limitador de peticiones con un balde de tokens, seguro entre hilos.
+
+    El balde se llena con `rate` tokens por segundo hasta `burst` tokens, cada petición consume
+    un token y si no hay disponibles espera. Con `rate` menor o igual a 0 no se limita, pero
+    igual se respetan las pausas de la API, ver `update_from_headers`.
+    """
+    def __init__(self, rate: float, burst: int = 1, /) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.__tokens = float(self.burst)
+        self.__updated_at = monotonic()
+        self.__paused_until = 0.0
+        self.__lock = Lock()
+
+    def acquire(self) -> None:
+        """Espera hasta que la petición se pueda realizar y consume un token."""
+        while True:
+            with self.__lock:
+                now = monotonic()
+                wait = self.__paused_until - now
+                if wait <= 0:
+                    if self.rate <= 0:
+                        return
+                    elapsed = max(now - self.__updated_at, 0)
+                    self.__tokens = min(self.burst, self.__tokens + elapsed * self.rate)
+                    self.__updated_at = now
+                    if self.__tokens >= 1:
+                        self.__tokens -= 1
+                        return
+                    wait = (1 - self.__tokens) / self.rate
+            sleep(wait)
+
+    def pause(self, seconds: float, /) -> None:
+        """
+        Detiene las peticiones durante los segundos dados, al terminar la pausa el balde solo
+        tiene un token para volver a llenarse gradualmente.
+        """
+        with self.__lock:
+            paused_until = monotonic() + seconds
+            if paused_until > self.__paused_until:
+                self.__paused_until = paused_until
+                self.__tokens = 1
+                self.__updated_at = paused_until
+
+    def update_from_headers(self, headers: Mapping[str, str], /) -> float | None:
+        """
+        Pausa las peticiones según los encabezados de la respuesta: `Retry-After`, o
+        `X-RateLimit-Remaining` en 0 junto a `X-RateLimit-Reset`. Devuelve los segundos de la
+        pausa, o `None` si los encabezados no la indican.
+        """
+        seconds = parse_retry_after(headers.get("Retry-After"))
+        if seconds is None and headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                reset = float(headers.get("X-RateLimit-Reset", ""))
+            except ValueError:
+                reset = None
+            if reset is not None:
+                # El reinicio puede ser en segundos restantes o una marca de tiempo epoch.
+                epoch = datetime.now(timezone.utc).timestamp()
+                seconds = max(reset - epoch, 0) if reset > epoch / 2 else reset
+        if seconds is not None:
+            self.pause(seconds)
+        return seconds
+
+def get_rate_limiter(name: str, rate: float, burst: int = 1, /) -> RateLimiter:
+    """
+    Devuelve el limitador de peticiones compartido por nombre, por ejemplo, por tienda, se crea
+    uno nuevo si cambia la configuración.
+    """
+    key = (name, rate, burst)
+    rate_limiter = _rate_limiters.get(key)
+    if rate_limiter is None:
+        with _rate_limiters_lock:
+            rate_limiter = _rate_limiters.get(key)
+            if rate_limiter is None:
+                rate_limiter = _rate_limiters[key] = RateLimiter(rate, burst)
+    return rate_limiter
@@ -1,31 +1,34 @@
 """TODO: DOCS"""
 
-from typing import Literal, overload
+from typing import Literal, Any, Iterable, Iterator, overload
 from os import environ
-from datetime import datetime
-from requests import api, RequestException
+from datetime import datetime, timedelta
+from threading import Lock, Thread
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from requests import RequestException, Response
+from .client import get_session, RETRY_STATUS_CODES, READ_POST_ALLOWED_METHODS
+from .json_stream import iter_array, iter_string_field
+from .token_cache import lock_token_cache, load_token_cache, save_token_cache
 from ..data.dynamics_service import (
     DataApiAuthentication, DataApiCredentials, DataApiPayload, DataApiResService,
     DataApiServiceBills, DataApiServiceProducts, DataApiServicePrices
 )
+from ..data.dataclass import get_decoder
 from ..config import Configuration, KeySitesDynamics
 from ..utils import ENVIRONMENT
 
-def login_service(dynamics_env: KeySitesDynamics | None = None, /) -> DataApiAuthentication:
-    """Realiza la peticion para hacer login en microsoft."""
-    dynamics_env = dynamics_env or ("prod" if ENVIRONMENT == "prod" else "uat")
-
-    ### Implementación de la caché, memoizacion de la autenticación.
-    if not hasattr(login_service, "__cache__"):
-        setattr(login_service, "__cache__", {})
-    __cache__: dict[KeySitesDynamics, DataApiAuthentication] = getattr(login_service, "__cache__")
+# Margenes antes de la expiración del token: se renueva en segundo plano al entrar en
+# `REFRESH_MARGIN` y se hace login antes de la petición al entrar en `EXPIRY_MARGIN`.
+REFRESH_MARGIN = timedelta(minutes=10)
+EXPIRY_MARGIN = timedelta(minutes=1)
 
-    if dynamics_env in __cache__:
-        authentication: DataApiAuthentication = __cache__[dynamics_env]
-        auth_is_expired = datetime.now() > authentication.expires_on
-        if not auth_is_expired:
-            return authentication
+_authentications: dict[str, DataApiAuthentication] = {}
+_refreshing: set[str] = set()
+_refreshing_lock = Lock()
 
+def get_credentials(dynamics_env: KeySitesDynamics, /) -> DataApiCredentials:
+    """Obtiene las credenciales del servicio Dynamics 365 de las variables de entorno."""
     resource = Configuration.get_site("dynamics:" + dynamics_env)
     credentials = DataApiCredentials(resource=resource.geturl())
 
@@ -36,27 +39,96 @@ def login_service(dynamics_env: KeySitesDynamics | None = None, /) -> DataApiAut
 
     if not credentials.exists():
         raise EnvironmentError("No se han establecido las credenciales del servicio Dynamics 365.")
+    return credentials
 
+def request_login(credentials: DataApiCredentials, /) -> dict[str, Any]:
+    """Realiza la peticion para hacer login en microsoft, devuelve la respuesta JSON."""
     credentials_dict = credentials.to_dict()
     aad_tenant = credentials_dict.pop("aad_tenant")
     url = Configuration.get_site("dynamics_login", "login", aad_tenant=aad_tenant)
     timeout = Configuration.api_service.dynamics_timeout
-    response = api.post(url.geturl(), data=credentials_dict, timeout=timeout)
+    session = get_session(url.geturl(), RETRY_STATUS_CODES, READ_POST_ALLOWED_METHODS)
+    response = session.post(url.geturl(), data=credentials_dict, timeout=timeout)
     if response.status_code != 200:
         raise RequestException("No se pudo hacer login en el servicio Dynamics 365.")
+    return response.json()
+
+def _is_valid(authentication: DataApiAuthentication, margin: timedelta, /) -> bool:
+    return datetime.now() < authentication.expires_on - margin
+
+def _load_or_login(key: str,
+                   credentials: DataApiCredentials,
+                   margin: timedelta, /) -> DataApiAuthentication:
+    """
+    Obtiene el token de la caché persistente, si no existe o expira dentro del margen hace login
+    y lo guarda, bloqueando la caché para que solo un proceso haga login.
+    """
+    with lock_token_cache():
+        cache = load_token_cache()
+        try:
+            authentication = DataApiAuthentication.from_dict(cache[key])
+        except (KeyError, TypeError, ValueError):
+            authentication = None
+        if authentication is None or not _is_valid(authentication, margin):
+            cache[key] = request_login(credentials)
+            authentication = DataApiAuthentication.from_dict(cache[key])
+            save_token_cache(cache)
+    _authentications[key] = authentication
+    return authentication
+
+def _refresh_in_background(key: str, credentials: DataApiCredentials, /) -> None:
+    """Renueva el token en un hilo, mientras tanto se sigue usando el token vigente."""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def refresh() -> None:
+        try:
+            _load_or_login(key, credentials, REFRESH_MARGIN)
+        except (RequestException, OSError, ValueError):
+            pass # Si no se renueva, se hace login al expirar el token.
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+    Thread(target=refresh, daemon=True).start()
+
+def login_service(dynamics_env: KeySitesDynamics | None = None, /) -> DataApiAuthentication:
+    """
+    Realiza la peticion para hacer login en microsoft.
+
+    El token se reutiliza entre procesos por medio de la caché persistente `token_cache` y se
+    renueva en segundo plano antes de expirar, ver `REFRESH_MARGIN`.
+    """
+    dynamics_env = dynamics_env or ("prod" if ENVIRONMENT == "prod" else "uat")
+    credentials = get_credentials(dynamics_env)
+    key = f"dynamics:{dynamics_env}:{credentials.client_id}:{credentials.resource}"
 
-    authentication = DataApiAuthentication.from_dict(response.json())
-    __cache__[dynamics_env] = authentication
-    setattr(login_service, "__cache__", __cache__)
+    authentication = _authentications.get(key)
+    if authentication is None or not _is_valid(authentication, EXPIRY_MARGIN):
+        authentication = _load_or_login(key, credentials, EXPIRY_MARGIN)
+    if not _is_valid(authentication, REFRESH_MARGIN):
+        _refresh_in_background(key, credentials)
     return authentication
 
 DynamicsService = Literal["bills", "bills_shopify", "products", "prices"]
 
-def request_service(service: DynamicsService,
-                    payload: DataApiPayload,
-                    dynamics_env: KeySitesDynamics | None = None,
-                    /) -> DataApiResService:
-    """Lanzar el servicio de dynamics 365."""
+# Tamaño de las partes al leer la respuesta del servicio por streaming.
+STREAM_CHUNK_SIZE = 65536
+
+# Campo que identifica los registros de cada servicio, para omitir los repetidos entre ventanas.
+SERVICE_ID_FIELDS: dict[str, str] = {
+    "bills": "id_integracion",
+    "bills_shopify": "id_integracion",
+    "prices": "id"
+}
+
+def _post_service(service: DynamicsService,
+                  payload: DataApiPayload,
+                  dynamics_env: KeySitesDynamics | None = None,
+                  /,
+                  stream=False) -> Response:
+    """Realiza la petición al servicio de dynamics 365 y valida el status code."""
     dynamics_env = dynamics_env or ("prod" if ENVIRONMENT == "prod" else "uat")
     url = Configuration.get_site("dynamics:" + dynamics_env, "service_" + service)
 
@@ -66,13 +138,99 @@ def request_service(service: DynamicsService,
     body = {"_request": payload.to_dict()}
     timeout = Configuration.api_service.dynamics_timeout
 
-    response = api.post(url.geturl(), headers=headers, json=body, timeout=timeout)
+    # Los servicios solo consultan datos, la petición POST se puede reintentar.
+    session = get_session(url.geturl(), RETRY_STATUS_CODES, READ_POST_ALLOWED_METHODS)
+    response = session.post(url.geturl(), headers=headers, json=body, timeout=timeout,
+                            stream=stream)
     status_code = response.status_code
     if status_code != 200:
+        response.close()
         msg = f"No se pudo obtener la data en el servicio Dynamics 365: Status code, {status_code}"
         raise RequestException(msg)
+    return response
+
+def request_service(service: DynamicsService,
+                    payload: DataApiPayload,
+                    dynamics_env: KeySitesDynamics | None = None,
+                    /) -> DataApiResService:
+    """Lanzar el servicio de dynamics 365."""
+    response = _post_service(service, payload, dynamics_env)
     return DataApiResService.from_dict(response.json())
 
+def _get_data_class(service: DynamicsService, /) -> type:
+    if service in ["bills", "bills_shopify"]:
+        return DataApiServiceBills
+    if service == "products":
+        return DataApiServiceProducts
+    if service == "prices":
+        return DataApiServicePrices
+    raise TypeError("No se ha seleccionado el servicio correcto en API Dynamics 365.")
+
+def iter_service(service: DynamicsService,
+                 payload: DataApiPayload,
+                 dynamics_env: KeySitesDynamics | None = None,
+                 /) -> Iterator[DataApiServiceBills | DataApiServiceProducts | DataApiServicePrices]:
+    """
+    Lanza el servicio de dynamics y devuelve uno por uno los registros de la data del servicio.
+
+    La respuesta se lee por streaming: el listado serializado en `DebugMessage` se decodifica
+    elemento por elemento, sin cargar en memoria la respuesta, el texto del listado y el listado
+    de diccionarios completos.
+    """
+    decoder = get_decoder(_get_data_class(service))
+    response = _post_service(service, payload, dynamics_env, stream=True)
+    try:
+        chunks = response.iter_content(STREAM_CHUNK_SIZE)
+        message = iter_string_field(chunks, "DebugMessage")
+        try:
+            first_part = next(message, None)
+        except TypeError as err:
+            msg = "El servicio Dynamics 365 no devolvió la data, 'DebugMessage' no es un texto."
+            raise RequestException(msg) from err
+        if first_part is None:
+            return # Sin `DebugMessage`, igual que `DataApiResService` sin data.
+        for data in iter_array(chain((first_part,), message)):
+            yield decoder(data)
+    finally:
+        response.close()
+
+def split_payload(payload: DataApiPayload, window: timedelta, /) -> list[DataApiPayload]:
+    """
+    Divide el rango de fechas `FecIni` - `FecFin` del payload en ventanas consecutivas de
+    duración máxima `window`, si el rango no es mayor a la ventana se devuelve el mismo payload.
+    """
+    if window <= timedelta(0) or payload.FecFin - payload.FecIni <= window:
+        return [payload]
+    payloads = []
+    start = payload.FecIni
+    while start < payload.FecFin:
+        end = min(start + window, payload.FecFin)
+        payloads.append(DataApiPayload(payload.DataAreaId, start, end))
+        start = end
+    return payloads
+
+def merge_windows(service: DynamicsService, windows: Iterable[list[Any]], /) -> list[Any]:
+    """
+    Une los registros de las ventanas en orden, omitiendo los registros de una ventana que ya se
+    obtuvieron en una ventana anterior, por ejemplo, los que coinciden con el limite del rango.
+    Los registros de una misma ventana se mantienen igual que en la respuesta del servicio.
+    """
+    id_field = SERVICE_ID_FIELDS.get(service)
+    result = []
+    seen: set[str] = set()
+    for records in windows:
+        if id_field is None:
+            result.extend(records)
+            continue
+        ids = set()
+        for record in records:
+            record_id = getattr(record, id_field)
+            if record_id and record_id in seen:
+                continue
+            ids.add(record_id)
+            result.append(record)
+        seen.update(ids)
+    return result
 
 @overload
 def get_service(service: Literal["bills"] | Literal["bills_shopify"],
@@ -93,16 +251,22 @@ def get_service(service: DynamicsService,
                 payload: DataApiPayload,
                 dynamics_env: KeySitesDynamics | None = None,
                 /):
-    """Lanza el servicio de dynamics y devuelve como resultado la data del servicio."""
-    data_response = request_service(service, payload, dynamics_env)
-    data_class = None
-    if service in ["bills", "bills_shopify"]:
-        data_class = DataApiServiceBills
-    elif service == "products":
-        data_class = DataApiServiceProducts
-    elif service == "prices":
-        data_class = DataApiServicePrices
-    else:
-        raise TypeError("No se ha seleccionado el servicio correcto en API Dynamics 365.")
-
-    return [data_class.from_dict(data) for data in data_response.DebugMessage]
+    """
+    Lanza el servicio de dynamics y devuelve como resultado la data del servicio.
+
+    Los rangos de fechas mayores a `dynamics_window` se dividen en ventanas que se consultan de
+    forma simultanea, hasta `dynamics_max_workers` peticiones, y se unen en orden, ver
+    `merge_windows`.
+    """
+    window = timedelta(seconds=Configuration.api_service.dynamics_window)
+    payloads = split_payload(payload, window)
+    if len(payloads) == 1:
+        return list(iter_service(service, payload, dynamics_env))
+
+    _get_data_class(service)
+    login_service(dynamics_env) # Un solo login para todas las ventanas.
+    max_workers = max(1, min(Configuration.api_service.dynamics_max_workers, len(payloads)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        windows = executor.map(lambda window_payload: list(
+            iter_service(service, window_payload, dynamics_env)), payloads)
+        return merge_windows(service, windows)
@@ -0,0 +1,194 @@
+"""
+Decodificación incremental de respuestas JSON.
+
+Algunos servicios devuelven un listado JSON serializado como texto dentro de otro JSON, por
+ejemplo, `DebugMessage` del servicio Dynamics 365. Estas funciones leen la respuesta por partes,
+extraen el texto del campo sin cargar toda la respuesta y decodifican el listado elemento por
+elemento, asi en memoria solo se mantiene la parte que se está leyendo.
+"""
+
+import re
+import json
+import codecs
+from typing import Any, Iterable, Iterator
+from json.decoder import scanstring
+
+_HIGH_SURROGATE = re.compile(r'\\u[dD][89abAB][0-9a-fA-F]{2}')
+_SEPARATOR = re.compile(r'[ \t\n\r]*([,\]])[ \t\n\r]*')
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+class _Reader:
+    """Lector de texto por partes, mantiene solo el texto pendiente por procesar."""
+    def __init__(self, chunks: Iterable[bytes | str], /) -> None:
+        self.__chunks = iter(chunks)
+        self.__utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def read(self) -> bool:
+        """Agrega la siguiente parte al texto pendiente, `False` si no hay más partes."""
+        if self.eof:
+            return False
+        self.text = self.text[self.pos:]
+        self.pos = 0
+        for chunk in self.__chunks:
+            if isinstance(chunk, bytes):
+                chunk = self.__utf8.decode(chunk)
+            if chunk:
+                self.text += chunk
+                return True
+        self.text += self.__utf8.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self, size=1) -> str:
+        """Devuelve los siguientes caracteres, lee más partes si es necesario."""
+        while len(self.text) - self.pos < size and self.read():
+            pass
+        return self.text[self.pos:self.pos + size]
+
+    def skip_whitespace(self) -> str:
+        """Omite los espacios en blanco y devuelve el siguiente caracter, vacio al final."""
+        while True:
+            char = self.peek()
+            if not char or char not in _WHITESPACE:
+                return char
+            self.pos += 1
+
+    def expect(self, char: str, /) -> None:
+        """Consume el caracter esperado o lanza un error de decodificación."""
+        if self.skip_whitespace() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.text, self.pos)
+        self.pos += 1
+
+def _is_escape_start(text: str, index: int, start: int, /) -> bool:
+    """Comprueba si la barra invertida en `index` inicia una secuencia de escape."""
+    run_start = index
+    while run_start > start and text[run_start - 1] == "\\":
+        run_start -= 1
+    return (index - run_start) % 2 == 0
+
+def _safe_end(text: str, start: int, /) -> int:
+    """
+    Posición hasta donde el contenido del string se puede decodificar sin cortar una secuencia
+    de escape, ni un par sustituto `\\uD83D\\uDE00`.
+    """
+    end = len(text)
+    index = text.rfind("\\", max(start, end - 12), end)
+    if index == -1:
+        return end
+    if not _is_escape_start(text, index, start):
+        return end # La barra invertida completa la secuencia `\\\\`.
+    size = 6 if text[index + 1:index + 2] == "u" else 2
+    if index + size > end:
+        cut = index
+    elif size == 6 and _HIGH_SURROGATE.match(text, index) and index + size == end:
+        cut = index # Puede continuar con el par del sustituto.
+    else:
+        return end
+    # Un sustituto bajo incompleto no se separa de su par.
+    if cut - 6 >= start and _HIGH_SURROGATE.match(text, cut - 6) \
+        and _is_escape_start(text, cut - 6, start):
+        cut -= 6
+    return cut
+
+def _iter_string(reader: _Reader, /) -> Iterator[str]:
+    """Devuelve por partes el texto decodificado del string JSON, el lector inicia en la comilla."""
+    reader.expect('"')
+    while True:
+        try:
+            # El string termina en la parte actual.
+            value, end = scanstring(reader.text, reader.pos, False)
+        except json.JSONDecodeError:
+            pass
+        else:
+            reader.pos = end
+            yield value
+            return
+
+        # Se decodifica el contenido disponible con una comilla final temporal.
+        end = _safe_end(reader.text, reader.pos)
+        if end > reader.pos:
+            value, end_value = scanstring(reader.text[reader.pos:end] + '"', 0, False)
+            if end_value <= end - reader.pos:
+                raise json.JSONDecodeError("Invalid string", reader.text, reader.pos)
+            yield value
+            reader.pos = end
+        if not reader.read():
+            raise json.JSONDecodeError("Unterminated string", reader.text, reader.pos)
+
+def _skip_value(reader: _Reader, /) -> None:
+    """Omite un valor JSON del objeto principal."""
+    char = reader.skip_whitespace()
+    if char == '"':
+        for _ in _iter_string(reader):
+            pass
+        return
+    depth = 0
+    while True:
+        char = reader.peek()
+        if not char:
+            raise json.JSONDecodeError("Expecting value", reader.text, reader.pos)
+        if char == '"':
+            _skip_value(reader)
+            continue
+        if char in "[{":
+            depth += 1
+        elif char in "]}" and depth > 0:
+            depth -= 1
+        elif char in ",}" and depth == 0:
+            return
+        reader.pos += 1
+
+def iter_string_field(chunks: Iterable[bytes | str], field: str, /) -> Iterator[str]:
+    """
+    Devuelve por partes el texto del campo string `field` del objeto JSON principal, sin
+    decodificar el resto de la respuesta. Si el campo no existe no devuelve nada.
+
+    :raises TypeError: Si el valor del campo no es un string, por ejemplo, `null`.
+    """
+    reader = _Reader(chunks)
+    reader.expect("{")
+    if reader.skip_whitespace() == "}":
+        return
+    while True:
+        key = "".join(_iter_string(reader))
+        reader.expect(":")
+        if key == field:
+            if reader.skip_whitespace() != '"':
+                raise TypeError(f"El valor del campo JSON '{field}' no es un string.")
+            yield from _iter_string(reader)
+            return
+        _skip_value(reader)
+        if reader.skip_whitespace() == "}":
+            return
+        reader.expect(",")
+
+def iter_array(chunks: Iterable[bytes | str], /) -> Iterator[Any]:
+    """Decodifica un listado JSON leído por partes y devuelve cada elemento."""
+    reader = _Reader(chunks)
+    reader.expect("[")
+    if reader.skip_whitespace() == "]":
+        return
+    while True:
+        try:
+            item, end = _decoder.raw_decode(reader.text, reader.pos)
+        except json.JSONDecodeError:
+            # El elemento puede estar incompleto, se intenta con la siguiente parte.
+            if reader.read():
+                continue
+            raise
+
+        # El elemento se acepta solo si le sigue el separador, un número al final de la parte
+        # puede continuar en la siguiente, por ejemplo, "976" + "83.2".
+        separator = _SEPARATOR.match(reader.text, end)
+        if (separator is None or separator.end() == len(reader.text)) and reader.read():
+            continue
+        if separator is None:
+            raise json.JSONDecodeError("Expecting ',' delimiter", reader.text, end)
+        reader.pos = separator.end()
+        yield item
+        if separator.group(1) == "]":
+            return
@@ -1,13 +1,17 @@
 """TODO: DOCS"""
 
-from typing import Literal, NamedTuple, Optional, Any, overload
+from typing import Literal, NamedTuple, Optional, Any, Iterator, TypeVar, overload
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlunparse, urlencode
-from requests import api, RequestException
+from requests import RequestException
+from .client import get_session, get_rate_limiter, RATE_LIMITED_RETRY_STATUS_CODES
 from ..config import Configuration, KeySitesShopifyStores, key_sites_shopify_stores
 from ..data import (DataStocky, DataStockyFile,
                     DataSuppliersFile, DataTaxTypesFile)
 
+T = TypeVar("T")
+
 KeySitesStockyAPISingle = Literal[
     "purchase_order",
     "stock_adjustment_item",
@@ -64,7 +68,8 @@ def request_service(service: KeySitesStockyAPI,
 
     url_store = Configuration.get_site("shopify_store:" + store_key)
     url_service = Configuration.get_site("stocky_api", "select_" + service, **kwargs)
-    url_service_query = urlencode(query._asdict())
+    url_service_query = urlencode({key: value for key, value in query._asdict().items()
+                                   if value is not None})
     url = urlunparse((
         url_service.scheme,
         url_service.netloc,
@@ -78,9 +83,21 @@ def request_service(service: KeySitesStockyAPI,
         "Store-Name": url_store.netloc,
         "Authorization": f"API KEY={data_stocky.api_key}"
     }
-    timeout = Configuration.api_service.stocky_timeout
+    config = Configuration.api_service
+    timeout = config.stocky_timeout
+    session = get_session(url, RATE_LIMITED_RETRY_STATUS_CODES)
+    rate_limiter = get_rate_limiter("stocky:" + store_key, config.stocky_rate_limit,
+                                    config.stocky_rate_burst)
 
-    response = api.get(url, headers=headers, timeout=timeout)
+    # Si se supera el limite de la API, la petición vuelve a esperar su turno.
+    for _ in range(config.max_retries + 1):
+        rate_limiter.acquire()
+        response = session.get(url, headers=headers, timeout=timeout)
+        seconds = rate_limiter.update_from_headers(response.headers)
+        if response.status_code != 429:
+            break
+        if seconds is None:
+            rate_limiter.pause(1 / config.stocky_rate_limit if config.stocky_rate_limit > 0 else 1)
     if response.status_code != 200:
         raise RequestException("No se pudo obtener la data en la API de Stocky.")
     return response.json()
@@ -112,8 +129,62 @@ def get_service(service: KeySitesStockyAPI,
         data_response = data_response[service]
     return data_response
 
+DEFAULT_PAGE_LIMIT = 100
+
+def iter_service(service: KeySitesStockyAPIList,
+                 store_key: KeySitesShopifyStores,
+                 data: DataStockyFile,
+                 /,
+                 query=StockyAPIUrlQuery(),
+                 **kwargs: Any) -> Iterator[dict[str, Any]]:
+    """
+    Recorre todas las paginas de un servicio de listado de la API de Stocky y devuelve cada
+    registro. Las paginas avanzan con `since_id`, o con `offset` si se establece en la consulta
+    o los registros no tienen id, la siguiente pagina se solicita mientras se consume la actual.
+
+    :param query: Consulta de la primera pagina, `limit` es el tamaño de las paginas.
+    """
+    query = query._replace(limit=query.limit or DEFAULT_PAGE_LIMIT)
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        future = executor.submit(get_service, service, store_key, data, query=query, **kwargs)
+        while future is not None:
+            page: list[dict[str, Any]] = future.result()
+            future = None
+            if len(page) >= query.limit:
+                ids = [record["id"] for record in page if record.get("id") is not None]
+                if query.offset is None and ids:
+                    query = query._replace(since_id=max(ids))
+                else:
+                    query = query._replace(offset=(query.offset or 0) + len(page))
+                future = executor.submit(get_service, service, store_key, data, query=query,
+                                         **kwargs)
+            yield from page
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
 DataApiStockyFile = DataSuppliersFile | DataTaxTypesFile
 
+# Margen de la consulta incremental, los registros repetidos se combinan por id.
+INCREMENTAL_OVERLAP = timedelta(minutes=5)
+
+def merge_by_id(records: list[T], updated_records: list[T], /) -> list[T]:
+    """
+    Combina los registros actualizados con los actuales por el campo `id`, los registros nuevos
+    se agregan al final.
+    """
+    merged = list(records)
+    positions = {record.id: pos for pos, record in enumerate(merged) if record.id is not None}
+    for record in updated_records:
+        pos = positions.get(record.id) if record.id is not None else None
+        if pos is None:
+            if record.id is not None:
+                positions[record.id] = len(merged)
+            merged.append(record)
+        else:
+            merged[pos] = record
+    return merged
+
 class ApiStockyFile:
     """
     Manejador API de stocky para todo los recursos en forma de servicio junto al archivo JSON de
@@ -126,8 +197,15 @@ class ApiStockyFile:
         self.data = data
         self.service = service
 
-    def update(self, query=StockyAPIUrlQuery(), **kwargs: Any) -> None:
-        """Actualiza la data del servicio desde la API de Stocky junsto al archivo JSON."""
+    def update(self, query=StockyAPIUrlQuery(), incremental=False, **kwargs: Any) -> None:
+        """
+        Actualiza la data del servicio desde la API de Stocky junsto al archivo JSON.
+
+        :param incremental: Solo solicita los registros modificados desde la ultima sincronización
+            de cada tienda `synced_at` con `updated_since` y los combina por id con los registros
+            actuales. Los registros eliminados solo se reflejan en la sincronización completa, si
+            nunca se ha realizado una sincronización completa se ignora este parametro.
+        """
         if isinstance(self.service, DataSuppliersFile):
             service_key = "suppliers"
         elif isinstance(self.service, DataTaxTypesFile):
@@ -135,29 +213,66 @@ class ApiStockyFile:
         else:
             raise TypeError("El parametro service no corresponde a algún servicio de API Stocky.")
 
-        service_data = {}
+        # La marca de cada tienda es el inicio de su ultima sincronización, las tiendas sin marca
+        # se consultan completas.
+        incremental = incremental and self.service.full_updated_at is not None
+        queries = {}
         for store_key in key_sites_shopify_stores:
+            synced_at = self.service.synced_at.get(store_key) if incremental else None
+            if synced_at is None:
+                queries[store_key] = query
+            else:
+                updated_since = synced_at - INCREMENTAL_OVERLAP
+                queries[store_key] = query._replace(updated_since=updated_since.isoformat())
+
+        # Las peticiones de las tiendas se ejecutan en paralelo, el error de una tienda no
+        # afecta a las demás.
+        sync_at = datetime.now()
+        service_data = {}
+        with ThreadPoolExecutor(max_workers=len(key_sites_shopify_stores)) as executor:
+            futures = {store_key: executor.submit(get_service, service_key, store_key, self.data,
+                                                  query=store_query, **kwargs)
+                       for store_key, store_query in queries.items()}
+        for store_key, future in futures.items():
             try:
-                response = get_service(service_key, store_key, self.data, query=query, **kwargs)
+                service_data[store_key] = future.result()
             except RequestException:
                 continue
-            service_data[store_key] = response
 
         service_instance = self.service.from_dict(service_data)
-        self.service.replace(service_instance)
+        if incremental:
+            for store_key in service_data:
+                records = getattr(service_instance, store_key)
+                if queries[store_key].updated_since is not None:
+                    records = merge_by_id(getattr(self.service, store_key), records)
+                setattr(self.service, store_key, records)
+                self.service.synced_at[store_key] = sync_at
+        else:
+            service_instance.full_updated_at = sync_at
+            service_instance.synced_at = {store_key: sync_at for store_key in service_data}
+            self.service.replace(service_instance)
+        self.service.__metadata__.refreshed_at = datetime.now()
         self.service.save_file()
 
-    def update_from_last_updated_at(self, range_time=timedelta(days=1)) -> None:
+    def update_from_last_updated_at(self,
+                                    range_time=timedelta(days=1),
+                                    full_range_time=timedelta(days=7)) -> None:
         """
         Actualiza las localizaciones solo si desde la ultima actualización no ha pasado el rango de
         tiempo dado en el parametro *range_time*.
 
-        Por defecto, desde el ultimo día de actualización.
+        Por defecto, desde el ultimo día de actualización. La actualización es incremental,
+        excepto si desde la ultima sincronización completa ha pasado el rango de tiempo dado en el
+        parametro *full_range_time*, por defecto una semana.
         """
-        updated_at = self.service.__metadata__.updated_at
+        # Los archivos anteriores sin `refreshed_at` usan la fecha de la ultima escritura.
+        updated_at = self.service.__metadata__.refreshed_at or self.service.__metadata__.updated_at
         if updated_at is None:
             self.update()
         else:
             diference_updated = datetime.now() - updated_at
             if diference_updated > range_time:
-                self.update()
+                full_updated_at = self.service.full_updated_at
+                incremental = full_updated_at is not None \
+                    and datetime.now() - full_updated_at <= full_range_time
+                self.update(incremental=incremental)
@@ -0,0 +1,78 @@
+"""
+Caché persistente de los tokens de autenticación, compartida entre procesos.
+
+Los tokens se guardan en un archivo JSON en `WORKING_DIR` con permisos solo para el usuario
+propietario (0o600), la lectura y escritura se sincronizan entre procesos con el bloqueo de un
+archivo `.lock`, asi cada ejecución del CLI reutiliza el token vigente en lugar de hacer login.
+"""
+
+import os
+import sys
+import json
+from typing import Any, Iterator
+from pathlib import Path
+from threading import Lock
+from contextlib import contextmanager
+from ..utils import WORKING_DIR
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+TOKEN_CACHE_NAME = ".tokens.json"
+FILE_MODE = 0o600
+
+_thread_lock = Lock()
+
+def get_token_cache_path() -> Path:
+    """Ruta del archivo de la caché de los tokens."""
+    return WORKING_DIR / TOKEN_CACHE_NAME
+
+@contextmanager
+def lock_token_cache(path: Path | None = None, /) -> Iterator[None]:
+    """Bloqueo exclusivo de la caché de los tokens, entre hilos y entre procesos."""
+    path = path or get_token_cache_path()
+    path.parent.mkdir(mode=511, parents=True, exist_ok=True)
+    path_lock = path.with_name(path.name + ".lock")
+    with _thread_lock:
+        fd = os.open(path_lock, os.O_RDWR | os.O_CREAT, FILE_MODE)
+        try:
+            if sys.platform == "win32":
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if sys.platform == "win32":
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+                else:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+def load_token_cache(path: Path | None = None, /) -> dict[str, Any]:
+    """Lee la caché de los tokens, si no existe o no es valida devuelve un diccionario vacio."""
+    path = path or get_token_cache_path()
+    try:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def save_token_cache(data: dict[str, Any], path: Path | None = None, /) -> None:
+    """Guarda la caché de los tokens de forma atomica, con permisos solo para el propietario."""
+    path = path or get_token_cache_path()
+    path.parent.mkdir(mode=511, parents=True, exist_ok=True)
+    path_tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    fd = os.open(path_tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, FILE_MODE)
+    try:
+        with open(fd, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(path_tmp, path)
+    except BaseException:
+        path_tmp.unlink(missing_ok=True)
+        raise
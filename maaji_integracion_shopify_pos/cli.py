@@ -3,6 +3,7 @@
 import click
 from .commands.run import run
 from .commands.clear import clear
+from .commands.diagnose import diagnose
 
 @click.group()
 def cli():
@@ -10,3 +11,4 @@ def cli():
 
 cli.add_command(run)
 cli.add_command(clear)
+cli.add_command(diagnose)
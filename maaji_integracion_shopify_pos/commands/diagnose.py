@@ -0,0 +1,94 @@
+"""
+Comandos de diagnostico de la automatización, por ejemplo, el tiempo de arranque del CLI.
+"""
+
+import os
+import sys
+import json
+import shutil
+import subprocess
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any
+import click
+from ..utils import WORKING_DIR, KEY_ENV_WORKING_DIR
+
+PROBE_MODULE = "maaji_integracion_shopify_pos.commands.startup_probe"
+# Archivos de `WORKING_DIR` que lee el arranque: `.env` y los de las instancias globales.
+PROBE_FILES = (".env", "configuration.json", "fieldsmapping.json", "locations.json",
+               "stocky.json", "suppliers.json")
+
+def parse_importtime(text: str, /, min_us: int = 0) -> list[dict[str, Any]]:
+    """
+    Convierte la salida de `python -X importtime` en un arbol de importaciones, cada modulo
+    con el tiempo propio, el tiempo acumulado en microsegundos y sus importaciones.
+
+    :param min_us: Omitir los modulos con un tiempo acumulado menor, en microsegundos.
+    """
+    # Los modulos se imprimen despues de sus importaciones, la profundidad es la sangría.
+    pending: dict[int, list[dict[str, Any]]] = {}
+    for line in text.splitlines():
+        if not line.startswith("import time:") or line.endswith("| imported package"):
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|", 2)
+        name = module.lstrip()
+        depth = (len(module) - len(name) - 1) // 2
+        node = {"module": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "imports": pending.pop(depth + 1, [])}
+        pending.setdefault(depth, []).append(node)
+
+    def prune(nodes: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        nodes = [node for node in nodes if node["cumulative_us"] >= min_us]
+        for node in nodes:
+            node["imports"] = prune(node["imports"])
+        return nodes
+    return prune(pending.get(0, []))
+
+def diagnose_startup_report(min_us: int = 1000, /) -> dict[str, Any]:
+    """
+    Ejecuta la sonda del arranque en un interprete nuevo y devuelve el reporte: arbol de
+    importaciones y tiempo de los efectos secundarios, ver `startup_probe`.
+
+    La sonda se ejecuta sobre una copia de los archivos del arranque en un directorio temporal,
+    asi los archivos que crean o guardan las instancias globales no modifican `WORKING_DIR`.
+    """
+    with TemporaryDirectory() as working_dir:
+        for name in PROBE_FILES:
+            if (WORKING_DIR / name).is_file():
+                shutil.copy2(WORKING_DIR / name, working_dir)
+        env = os.environ | {KEY_ENV_WORKING_DIR: working_dir}
+        start = perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", "-m", PROBE_MODULE],
+                                capture_output=True, text=True, check=False, env=env)
+        total_seconds = perf_counter() - start
+    if result.returncode != 0:
+        raise click.ClickException("Error en la sonda del arranque:\n" + result.stderr)
+
+    report: dict[str, Any] = {
+        "created_at": datetime.now().isoformat(),
+        "python": sys.version,
+        "total_seconds": total_seconds
+    }
+    report.update(json.loads(result.stdout))
+    report["imports"] = parse_importtime(result.stderr, min_us)
+    return report
+
+@click.command("startup")
+@click.option("--min-us", type=int, default=1000, show_default=True,
+              help="Omitir los modulos con un tiempo de importación acumulado menor (µs).")
+@click.option("-o", "--output", type=click.File("w", encoding="utf-8"), default="-",
+              help="Archivo donde se escribe el reporte JSON, por defecto la salida estandar.")
+def diagnose_startup(min_us: int, output) -> None:
+    """Reporte JSON del tiempo de importación y de los efectos secundarios del arranque."""
+    report = diagnose_startup_report(min_us)
+    json.dump(report, output, indent=2)
+    output.write("\n")
+
+@click.group()
+def diagnose() -> None:
+    """Grupo de comandos de diagnostico de la automatización."""
+
+diagnose.add_command(diagnose_startup)
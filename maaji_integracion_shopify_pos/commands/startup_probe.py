@@ -0,0 +1,101 @@
+"""
+Sonda del arranque del CLI, se ejecuta en un interprete nuevo desde `diagnose startup`:
+
+    python -X importtime -m maaji_integracion_shopify_pos.commands.startup_probe
+
+Importa el CLI y crea las instancias globales de carga diferida, midiendo el tiempo de cada una,
+el resultado se escribe en formato JSON en la salida estandar. Antes del CLI solo importa modulos
+de la libreria estandar y `dotenv`, para medir por separado `load_dotenv` que se ejecuta al
+importar `utils`, su tiempo también se incluye en el de la importación.
+
+Las instancias globales pueden crear o guardar sus archivos, `diagnose startup` ejecuta la sonda
+con un `WORKING_DIR` temporal.
+"""
+
+import sys
+import json
+from time import perf_counter
+from importlib import import_module
+
+# Instancias globales de carga diferida: (modulo, nombre).
+LAZY_SINGLETONS = (
+    ("maaji_integracion_shopify_pos.config", "Configuration"),
+    ("maaji_integracion_shopify_pos.fieldsmapping", "FieldMapping"),
+    ("maaji_integracion_shopify_pos.controllers.locations", "DataLocations"),
+    ("maaji_integracion_shopify_pos.controllers.stocky", "DataStocky"),
+    ("maaji_integracion_shopify_pos.controllers.stocky", "DataSuppliers"),
+)
+
+def probe() -> dict:
+    """Mide la importación del CLI y los efectos secundarios del arranque."""
+    side_effects = []
+    start = perf_counter()
+    # Importación con la sentencia `import`, `-X importtime` no registra `import_module`.
+    import dotenv
+    load_dotenv = dotenv.load_dotenv
+
+    def timed_load_dotenv(dotenv_path=None, *args, **kwargs):
+        """Registra el tiempo de `load_dotenv`, `utils` lo invoca al importarse."""
+        start = perf_counter()
+        try:
+            return load_dotenv(dotenv_path, *args, **kwargs)
+        finally:
+            seconds = perf_counter() - start
+            side_effects.append({"name": "utils.load_dotenv",
+                                 "seconds": seconds,
+                                 "calls": [{"method": "load_dotenv",
+                                            "file": getattr(dotenv_path, "name", dotenv_path),
+                                            "seconds": seconds}]})
+
+    dotenv.load_dotenv = timed_load_dotenv
+    try:
+        import maaji_integracion_shopify_pos.cli
+    finally:
+        dotenv.load_dotenv = load_dotenv
+    import_seconds = perf_counter() - start
+
+    utils = import_module("maaji_integracion_shopify_pos.utils")
+    # `utils` conserva la referencia de la importación, las siguientes invocaciones no se miden.
+    vars(utils)["__load_dotenv"] = load_dotenv
+    data_class_file = import_module("maaji_integracion_shopify_pos.data.dataclass").DataClassFile
+    calls = []
+
+    def timed(method_name: str):
+        """Registra el tiempo de los metodos de archivo que invocan las instancias globales."""
+        method = getattr(data_class_file, method_name)
+        def wrapper(self, *args, **kwargs):
+            if method_name == "save_file":
+                # La ruta de los metadatos del archivo cargado puede ser otro directorio, solo
+                # se escribe en el `WORKING_DIR` de la sonda.
+                self.setpath(utils.WORKING_DIR)
+            start = perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                calls.append({"method": method_name,
+                              "file": self.getname(),
+                              "seconds": perf_counter() - start})
+        return wrapper
+
+    for method_name in ("load_file", "save_file"):
+        setattr(data_class_file, method_name, timed(method_name))
+
+    for module_name, name in LAZY_SINGLETONS:
+        proxy = getattr(import_module(module_name), name)
+        if utils.LazyProxy.isloaded(proxy):
+            continue
+        calls = []
+        start = perf_counter()
+        utils.LazyProxy.getinstance(proxy)
+        side_effects.append({"name": f"{module_name.split('.', 1)[1]}.{name}",
+                             "seconds": perf_counter() - start,
+                             "calls": calls})
+
+    return {
+        "import_seconds": import_seconds,
+        "side_effects_seconds": sum(effect["seconds"] for effect in side_effects),
+        "side_effects": side_effects
+    }
+
+if __name__ == "__main__":
+    json.dump(probe(), sys.stdout)
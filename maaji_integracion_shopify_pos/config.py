@@ -2,10 +2,10 @@
 Modulo que mapea toda la configuración mediante un archivo JSON con valores por defecto.
 """
 
-from typing import Literal, overload
-from dataclasses import dataclass, field
+from typing import Any, Literal, overload, cast
+from dataclasses import dataclass, field, fields
 from .data.dataclass import DataClass, DataClassFileJson, FileJSONContext, MetaDataClassFile
-from .utils import UrlParser, WORKING_DIR
+from .utils import UrlParser, LazyProxy, WORKING_DIR
 
 KeyWebdriverName = Literal["chrome", "edge", "firefox"]
 
@@ -100,24 +100,35 @@ class ConfigWebDriver(DataClass):
         """
         add_arguments: list[str] = field(default_factory=lambda: default_webdriver_arguments)
 
-    wait_timeout: float = 30
+    wait_timeout: float = 30.0
     profile: str = "profile_default"
     options: Options = field(default_factory=Options)
     name_webdriver: str = "chrome"
 
+class _SiteUrls:
+    """Base de los sitios, al asignar una URL se descartan los indices de `Sites`."""
+
+    # Versión de las URL de todos los sitios, aumenta con cada asignación.
+    _version = 0
+
+    def __setattr__(self, name: str, value: Any, /) -> None:
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            _SiteUrls._version += 1
+
 @dataclass
-class Sites(DataClass):
+class Sites(_SiteUrls, DataClass):
     """Mapeo de todos los sitios y URL por los cuales la integración se va estar ubicando."""
 
     @dataclass
-    class ShopifyStore(DataClass):
+    class ShopifyStore(_SiteUrls, DataClass):
         """Estructura del nombre de todas las tiendas MAAJI."""
         maaji_co_test: str = "https://maaji-co-test.myshopify.com"
         maaji_pos: str = "https://maaji-pos.myshopify.com"
         maaji_pos_outlet: str = "https://maaji-pos-outlet.myshopify.com"
 
     @dataclass
-    class Dynamics(DataClass):
+    class Dynamics(_SiteUrls, DataClass):
         """Estructura del nombre de todas las tiendas MAAJI."""
         prod: str = "https://artmodeprod.operations.dynamics.com"
         uat: str = "https://artmodeuat.sandbox.operations.dynamics.com"
@@ -147,20 +158,50 @@ class Sites(DataClass):
     def __getitem__(self, key: SplitedStyleKeySites, /) -> UrlParser:
         return self.url(key)
 
+    # Indices de los sitios: (versión de las URL, {llave: netloc}, {netloc: llave}).
+    __netlocs = None
+
+    def __site_netlocs(self) -> tuple[dict[str, str], dict[str, str]]:
+        """
+        Devuelve los indices llave -> netloc y netloc -> llave de los sitios, se reconstruyen
+        si se asigna alguna URL o sitio, ver `_SiteUrls`.
+        """
+        if self.__netlocs is not None and self.__netlocs[0] == _SiteUrls._version:
+            return self.__netlocs[1], self.__netlocs[2]
+
+        key_netlocs: dict[str, str] = {}
+        netloc_keys: dict[str, str] = {}
+        for key in splited_style_key_sites:
+            url = self.__site_value(key)
+            if not isinstance(url, str):
+                continue # Sitio no valido, `url` devuelve el error.
+            netloc = UrlParser(url).netloc
+            key_netlocs[key] = netloc
+            netloc_keys.setdefault(netloc, key) # La primera llave como en el orden original.
+        self.__netlocs = (_SiteUrls._version, key_netlocs, netloc_keys)
+        return key_netlocs, netloc_keys
+
+    def __site_value(self, key: str, /) -> object | None:
+        """Valor configurado del sitio según la llave, sin convertir a `UrlParser`."""
+        name_sites = key.split(":")
+        obj_site = getattr(self, name_sites[0], None)
+        if name_sites[1:] and hasattr(obj_site, name_sites[1]):
+            obj_site = getattr(obj_site, name_sites[1])
+        return obj_site
+
     def is_site(self, key: SplitedStyleKeySites, url: str, /) -> bool:
         """Compara una URL si es un sitio que se configurado."""
 
-        current_url = UrlParser(url)
-        site = self.url(key)
-        return current_url.netloc == site.netloc
+        key_netlocs, _ = self.__site_netlocs()
+        if key not in key_netlocs:
+            return UrlParser(url).netloc == self.url(key).netloc
+        return UrlParser(url).netloc == key_netlocs[key]
 
     def getsite(self, url: str, /) -> SplitedStyleKeySites | None:
         """Devuelve la llave si la URL existe como sitio en la configuación o sino None."""
 
-        for key in splited_style_key_sites:
-            if self.is_site(key, url):
-                return key
-        return None
+        _, netloc_keys = self.__site_netlocs()
+        return cast(SplitedStyleKeySites | None, netloc_keys.get(UrlParser(url).netloc))
 
 @dataclass
 class SiteActions(DataClass):
@@ -270,15 +311,41 @@ class ConfigPurchaseOrders(DataClass):
     default_supplier_name_like: Nombre para buscar el proveedor por defecto cuando
                                 no se establece uno en la propia orden de compra.
     """
-    timeout_add_products: float = 300 # 300 segundos = 5 minutos
+    timeout_add_products: float = 300.0 # 300 segundos = 5 minutos
     default_supplier_name_like: str = "ART MODE"
 
 
 @dataclass
 class ConfigApiService(DataClass):
-    """configuración para los servicios de API."""
-    dynamics_timeout: float = 300 # 5 minutos
-    stocky_timeout: float = 300
+    """
+    configuración para los servicios de API.
+
+    Campos
+    ______
+
+    pool_size: Cantidad de conexiones que se mantienen abiertas por cada host.
+    max_retries: Reintentos de las peticiones ante errores de conexión o los estados 429/5xx,
+                 solo en los metodos idempotentes, por ejemplo, GET, y en las peticiones POST
+                 de consulta del login y los servicios de Dynamics 365.
+    backoff_factor: Factor de la espera exponencial entre los reintentos, en segundos.
+    backoff_jitter: Tiempo aleatorio máximo que se suma a la espera entre los reintentos.
+    stocky_rate_limit: Peticiones por segundo a la API de Stocky por cada tienda, las demás
+                       peticiones esperan su turno, 0 para no limitar.
+    stocky_rate_burst: Peticiones que se pueden realizar seguidas antes de aplicar el limite.
+    dynamics_window: Duración máxima en segundos del rango de fechas de cada petición al servicio
+                     Dynamics 365, los rangos mayores se dividen en ventanas, 0 para no dividir.
+    dynamics_max_workers: Peticiones simultaneas de las ventanas al servicio Dynamics 365.
+    """
+    dynamics_timeout: float = 300.0 # 5 minutos
+    stocky_timeout: float = 300.0
+    pool_size: int = 10
+    max_retries: int = 3
+    backoff_factor: float = 0.5
+    backoff_jitter: float = 0.5
+    stocky_rate_limit: float = 2.0
+    stocky_rate_burst: int = 4
+    dynamics_window: float = 86400.0 # 1 día
+    dynamics_max_workers: int = 4
 
 @dataclass
 class ConfigurationFile(DataClassFileJson):
@@ -294,6 +361,45 @@ class ConfigurationFile(DataClassFileJson):
     purchase_orders: ConfigPurchaseOrders = field(default_factory=ConfigPurchaseOrders)
     api_service: ConfigApiService = field(default_factory=ConfigApiService)
 
+    # Tabla compilada de `get_site`: (sites, sites_actions, {(llave, acción): (plantilla, url)}).
+    __sites_table = None
+
+    def __compile_sites(self) -> dict[tuple[str, str | None], tuple[str, UrlParser | None]]:
+        """
+        Compila las URL de todos los sitios y sus acciones como plantillas de texto, junto a la
+        URL sin formato si la plantilla no tiene argumentos. La tabla se vuelve a compilar si se
+        reemplazan `sites` o `sites_actions`, por ejemplo, al recargar el archivo.
+        """
+        if self.__sites_table is not None:
+            sites, sites_actions, table = self.__sites_table
+            if sites is self.sites and sites_actions is self.sites_actions:
+                return table
+
+        table = {}
+        def add(key: tuple[str, str | None], url: UrlParser) -> None:
+            template = url.geturl()
+            try:
+                table[key] = (template, UrlParser(template.format()))
+            except (KeyError, IndexError):
+                table[key] = (template, None)
+
+        for key_site in splited_style_key_sites:
+            try:
+                url_site = self.sites.url(key_site)
+                add((key_site, None), url_site)
+                obj_site_action = getattr(self.sites_actions, key_site.split(":")[0], None)
+                if obj_site_action is None:
+                    continue
+                for site_action in fields(obj_site_action):
+                    name_action = site_action.name
+                    add((key_site, name_action),
+                        url_site / self.sites_actions.url(key_site, name_action))
+            except (ValueError, TypeError, AttributeError):
+                continue # Se omite de la tabla, `get_site` devuelve el error del sitio.
+
+        self.__sites_table = (self.sites, self.sites_actions, table)
+        return table
+
     @overload
     def get_site(
         self,
@@ -329,6 +435,13 @@ class ConfigurationFile(DataClassFileJson):
         :raises ValueError: Si las llaves para acceder a los sitios no es valida ó si la acción
             no existe.
         """
+        compiled = self.__compile_sites().get((key, name_action))
+        if compiled is not None:
+            template, url_compiled = compiled
+            if url_compiled is not None and not kwargs:
+                return url_compiled
+            return UrlParser(template.format(**kwargs))
+
         url_site = self.sites.url(key)
         if name_action is not None:
             url_action = self.sites_actions.url(key, name_action)
@@ -337,10 +450,17 @@ class ConfigurationFile(DataClassFileJson):
         url = url_site if url_action is None else url_site / url_action
         return url.format(**kwargs)
 
-Configuration = ConfigurationFile()
-Configuration.setpath(WORKING_DIR)
-Configuration.setname("configuration.json")
-ConfigurationContext = FileJSONContext(onsave=FileJSONContext.OnSave(indent=4))
-Configuration.setcontext(ConfigurationContext)
-Configuration.load_file()
-Configuration.save_file()
+ConfigurationContext = FileJSONContext(onload=FileJSONContext.OnLoad(snapshot=True),
+                                       onsave=FileJSONContext.OnSave(indent=4))
+
+def _load_configuration() -> ConfigurationFile:
+    """Carga la configuración y guarda los valores por defecto, en el primer acceso."""
+    configuration = ConfigurationFile()
+    configuration.setpath(WORKING_DIR)
+    configuration.setname("configuration.json")
+    configuration.setcontext(ConfigurationContext)
+    configuration.load_file()
+    configuration.save_file()
+    return configuration
+
+Configuration = cast(ConfigurationFile, LazyProxy(_load_configuration))
@@ -1,5 +1,6 @@
 """TODO: DOCS"""
 
+from typing import Iterable
 from datetime import datetime
 from .locations import get_weblocations
 # from .stocky import WebStocky, ApiStockySuppliers ### En caso de que proveedor deje ser ART MODE.
@@ -21,26 +22,45 @@ def bill_line_to_purchase_item(bill: Dynamics.DataApiServiceBills, /):
         cost_price=costo_compra
     )
 
-def validate_bill_store(bill: Dynamics.DataApiServiceBills, store_key: KeySitesShopifyStores, /):
-    """Realiza la validación de la tienda y homologa el campo con la localización el shopify."""
+def resolve_bill_stores(bills: Iterable[Dynamics.DataApiServiceBills],
+                        store_key: KeySitesShopifyStores, /) -> dict[str, DataLocation | None]:
+    """
+    Homologa una sola vez cada campo Tienda distinto de las facturas con la localización en
+    shopify, `None` si no se encuentra la localización.
+    """
+    tiendas = {bill.tienda for bill in bills}
+    if not tiendas:
+        return {}
+
     web_locations = get_weblocations()
     web_locations.update_from_last_updated_at()
+    locations: list[DataLocation] = getattr(web_locations.data, store_key)
+
+    resolved_stores: dict[str, DataLocation | None] = {}
+    for tienda in tiendas:
+        shopify_stores = FieldMapping.stores.resolve(tienda).shopify
+        store_names = None if not shopify_stores else shopify_stores[0].names
+        resolved_stores[tienda] = None if not store_names else \
+            next((location for location in locations if location.name in store_names), None)
+    return resolved_stores
+
+def validate_bill_store(bill: Dynamics.DataApiServiceBills,
+                        store_key: KeySitesShopifyStores,
+                        /,
+                        resolved_stores: dict[str, DataLocation | None] | None = None):
+    """
+    Realiza la validación de la tienda y homologa el campo con la localización el shopify.
 
-    fieldmapping_stores = FieldMapping.stores.find(lambda fd: bill.tienda in fd.codes \
-                                                   or bill.tienda in fd.names)
-    store_names = None if not fieldmapping_stores.shopify else fieldmapping_stores.shopify[0].names
-
-    err_msg = "No se encontro el campo Tienda de la factura D365 '{}' en Shopify localización: '{}'"
-    err = ValueError(err_msg.format(bill.numero_factura, bill.tienda))
-
-    if store_names:
-        locations: list[DataLocation] = getattr(web_locations.data, store_key)
-        location = next((location for location in locations if location.name in store_names), None)
-    else:
-        raise err
+    :param resolved_stores: Tiendas homologadas previamente con `resolve_bill_stores`.
+    """
+    if resolved_stores is None or bill.tienda not in resolved_stores:
+        resolved_stores = resolve_bill_stores([bill], store_key)
 
+    location = resolved_stores[bill.tienda]
     if not location:
-        raise err
+        err_msg = "No se encontro el campo Tienda de la factura D365 '{}' en Shopify " \
+                  "localización: '{}'"
+        raise ValueError(err_msg.format(bill.numero_factura, bill.tienda))
     return location
 
 def validate_bill_supplier(bill: Dynamics.DataApiServiceBills, /):
@@ -51,11 +71,13 @@ def validate_bill_supplier(bill: Dynamics.DataApiServiceBills, /):
     return "ART MODE"
 
 def one_bill_line_to_purchase_order(bill: Dynamics.DataApiServiceBills,
-                                    store_key: KeySitesShopifyStores, /):
+                                    store_key: KeySitesShopifyStores,
+                                    /,
+                                    resolved_stores: dict[str, DataLocation | None] | None = None):
     """
     Convierte un resultado de la factura del servicio dynamics 365 a una orden de compra en stocky.
     """
-    tienda = validate_bill_store(bill, store_key)
+    tienda = validate_bill_store(bill, store_key, resolved_stores)
     # tienda = 72046280749 # bill.tienda <- ID localizacion Shopify = MAAJI MAYORCA Test
     proveedor = validate_bill_supplier(bill)
     fecha_factura = datetime.strptime(bill.fecha_factura, "%m/%d/%Y").date()
@@ -93,7 +115,9 @@ def bill_lines_to_purchase_items(bills: list[Dynamics.DataApiServiceBills], /):
     return [bill_line_to_purchase_item(bill) for bill in bills]
 
 def bill_to_purchase_order(bills: list[Dynamics.DataApiServiceBills],
-                            store_key: KeySitesShopifyStores, /):
+                           store_key: KeySitesShopifyStores,
+                           /,
+                           resolved_stores: dict[str, DataLocation | None] | None = None):
     """
     Convierte varios resultados de la factura del servicio dynamics 365 a una orden de compra
     en stocky.
@@ -102,7 +126,7 @@ def bill_to_purchase_order(bills: list[Dynamics.DataApiServiceBills],
         raise ValueError("No hay factura del servicio D365.")
 
     purchase_items = bill_lines_to_purchase_items(bills)
-    row_purchase_order = one_bill_line_to_purchase_order(bills[0], store_key)
+    row_purchase_order = one_bill_line_to_purchase_order(bills[0], store_key, resolved_stores)
     row_purchase_order.purchase_items = purchase_items
     amount_items = sum((float(i.cost_price) * i.quantity for i in purchase_items))
     row_purchase_order.amount_items = amount_items
@@ -118,10 +142,13 @@ def bills_to_purchase_orders(bills: list[Dynamics.DataApiServiceBills],
     en stocky.
     """
     bills_lines_splited = splitlines_bills(bills)
+    # Las tiendas se homologan una sola vez por lote, no por cada factura.
+    resolved_stores = resolve_bill_stores((lines[0] for lines in bills_lines_splited if lines),
+                                          store_key)
     purchase_orders: list[DataPurchaseOrdersFile] = []
     for bill in bills_lines_splited:
         try:
-            purchase_order = bill_to_purchase_order(bill, store_key)
+            purchase_order = bill_to_purchase_order(bill, store_key, resolved_stores)
             purchase_orders.append(purchase_order)
         except ValueError: # No se homologa el campo Tienda con la localizacion en shopify
             pass
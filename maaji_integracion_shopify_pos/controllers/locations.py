@@ -1,22 +1,31 @@
 """TODO: DOCS"""
 
+from typing import cast
 from functools import lru_cache
 from ..data.dataclass import FileJSONContext
 from ..data.locations import DataLocationsFile
-from ..web.webdriver import get_webdriver
-from ..web.locations import WebLocationsFile
-from ..utils import WORKING_DIR
+from ..utils import LazyProxy, WORKING_DIR
 
-DataLocations = DataLocationsFile()
-DataLocations.setname("locations.json")
-DataLocations.setpath(WORKING_DIR)
-DataLocationsContext = FileJSONContext(onsave=FileJSONContext.OnSave(indent=4))
-DataLocations.setcontext(DataLocationsContext)
-DataLocations.load_file()
+DataLocationsContext = FileJSONContext(onload=FileJSONContext.OnLoad(snapshot=True),
+                                       onsave=FileJSONContext.OnSave(indent=4))
+
+def _load_locations() -> DataLocationsFile:
+    """Carga la cache de las localizaciones, en el primer acceso."""
+    data_locations = DataLocationsFile()
+    data_locations.setname("locations.json")
+    data_locations.setpath(WORKING_DIR)
+    data_locations.setcontext(DataLocationsContext)
+    data_locations.load_file()
+    return data_locations
+
+DataLocations = cast(DataLocationsFile, LazyProxy(_load_locations))
 
 @lru_cache()
 def get_weblocations():
     """Devuelve el controlador web de las localizaciones en shopify."""
+    # Importación diferida, selenium solo se carga al usar el navegador.
+    from ..web.webdriver import get_webdriver
+    from ..web.locations import WebLocationsFile
     web_locations = WebLocationsFile(get_webdriver(), DataLocations)
     web_locations.update_from_last_updated_at()
     return web_locations
@@ -1,13 +1,10 @@
 """TODO: DOCS"""
 
 from datetime import datetime
-from selenium.common.exceptions import WebDriverException
 from .dynamics_service import bills_to_purchase_orders
 from .locations import get_weblocations
 from .stocky import get_webstocky, get_apistocky_suppliers
 from ..api.dynamics_service import get_service, DataApiPayload
-from ..web.webdriver import get_webdriver
-from ..web.purchase_orders import WebPurchaseOrderFile
 from ..data.dataclass import EnumMetaDataFileStatus as FileStatus
 from ..data import DataPurchaseOrdersFile, FilePurchaseOrderContext
 from ..config import KeySitesDynamics, KeySitesShopifyStores
@@ -25,6 +22,9 @@ default_fieldnames = [None, None, None, *default_fieldnames]
 
 def create_from_path(path: str, /):
     """Crea una orden de compra desde una ruta."""
+    # Importación diferida, selenium solo se carga al usar el navegador.
+    from ..web.webdriver import get_webdriver
+    from ..web.purchase_orders import WebPurchaseOrderFile
 
     data_purchase_order = DataPurchaseOrdersFile()
 
@@ -57,6 +57,10 @@ def create_from_service(payload: DataApiPayload,
     if not bills:
         return None
     data_purchase_orders = bills_to_purchase_orders(bills, store_key)
+    # Importación diferida, selenium solo se carga al usar el navegador.
+    from selenium.common.exceptions import WebDriverException
+    from ..web.webdriver import get_webdriver
+    from ..web.purchase_orders import WebPurchaseOrderFile
 
     context = FilePurchaseOrderContext()
     context.onload.fieldnames = default_fieldnames
@@ -1,33 +1,49 @@
 """TODO: DOCS"""
 
+from typing import cast
 from functools import lru_cache
 from ..data.dataclass import FileJSONContext
 from ..data import DataStockyFile, DataSuppliersFile
-from ..web.webdriver import get_webdriver
-from ..web.stocky import WebStockyFile
 from ..api.stocky import ApiStockyFile
-from ..utils import WORKING_DIR
+from ..utils import LazyProxy, WORKING_DIR
 
-DataStocky = DataStockyFile()
-DataStocky.setname("stocky.json")
-DataStocky.setpath(WORKING_DIR)
-DataStockyContext = FileJSONContext(onsave=FileJSONContext.OnSave(indent=4))
-DataStocky.setcontext(DataStockyContext)
-DataStocky.load_file()
+DataStockyContext = FileJSONContext(onload=FileJSONContext.OnLoad(snapshot=True),
+                                    onsave=FileJSONContext.OnSave(indent=4))
+
+def _load_stocky() -> DataStockyFile:
+    """Carga la cache de los datos básicos de stocky, en el primer acceso."""
+    data_stocky = DataStockyFile()
+    data_stocky.setname("stocky.json")
+    data_stocky.setpath(WORKING_DIR)
+    data_stocky.setcontext(DataStockyContext)
+    data_stocky.load_file()
+    return data_stocky
+
+DataStocky = cast(DataStockyFile, LazyProxy(_load_stocky))
 
 @lru_cache()
 def get_webstocky():
     """Devuelve el controlador web de los datos básicos de stocky."""
+    # Importación diferida, selenium solo se carga al usar el navegador.
+    from ..web.webdriver import get_webdriver
+    from ..web.stocky import WebStockyFile
     web_stocky = WebStockyFile(get_webdriver(), DataStocky)
     web_stocky.update_from_last_updated_at()
     return web_stocky
 
-DataSuppliers = DataSuppliersFile()
-DataSuppliers.setname("suppliers.json")
-DataSuppliers.setpath(WORKING_DIR)
-DataSuppliersContext = FileJSONContext(onsave=FileJSONContext.OnSave(indent=4))
-DataSuppliers.setcontext(DataSuppliersContext)
-DataSuppliers.load_file()
+DataSuppliersContext = FileJSONContext(onload=FileJSONContext.OnLoad(snapshot=True),
+                                       onsave=FileJSONContext.OnSave(indent=4))
+
+def _load_suppliers() -> DataSuppliersFile:
+    """Carga la cache de los proveedores de stocky, en el primer acceso."""
+    data_suppliers = DataSuppliersFile()
+    data_suppliers.setname("suppliers.json")
+    data_suppliers.setpath(WORKING_DIR)
+    data_suppliers.setcontext(DataSuppliersContext)
+    data_suppliers.load_file()
+    return data_suppliers
+
+DataSuppliers = cast(DataSuppliersFile, LazyProxy(_load_suppliers))
 
 @lru_cache()
 def get_apistocky_suppliers():
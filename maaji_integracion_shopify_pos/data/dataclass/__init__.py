@@ -7,7 +7,9 @@ __all__ = [
     "MetaDataClassFile", "MetaDataClassFileStatus", "EnumMetaDataFileStatus",
     "DataClassFile",
     "DataClassFileJson", "FileJSONContext",
-    "DataClassFileCsv", "EnumDataClassFileCsvRows", "_PredicatePartialRows", "FileCSVContext"
+    "DataClassFileCsv", "EnumDataClassFileCsvRows", "_PredicatePartialRows", "FileCSVContext",
+    "get_decoder", "get_encoder",
+    "CsvColumns", "CsvRowView"
 ]
 
 from pathlib import Path, WindowsPath, PosixPath
@@ -20,6 +22,9 @@ from .file import DataClassFile
 from .file_json import DataClassFileJson, FileJSONContext
 from .file_csv import (DataClassFileCsv, EnumDataClassFileCsvRows,
                        _PredicatePartialRows, FileCSVContext)
+from .decoder import get_decoder
+from .encoder import get_encoder
+from .columns import CsvColumns, CsvRowView
 
 T = TypeVar("T")
 
@@ -0,0 +1,157 @@
+"""
+Almacenamiento columnar de las filas de los archivos CSV.
+
+En lugar de guardar una instancia del dataclass por cada fila, se guarda un listado por cada campo
+y se entregan vistas ligeras de las filas (`__slots__`) que leen y escriben sobre las columnas.
+Util para archivos con muchas filas, por ejemplo, los articulos de las ordenes de compra, y para
+operaciones sobre toda una columna.
+"""
+
+from typing import TypeVar, Generic, Any, Iterable, Iterator, overload
+from dataclasses import fields
+from .metadata import MetaDataClassFile
+
+T = TypeVar("T")
+
+class CsvRowView:
+    """
+    Vista de una fila del almacenamiento columnar, los atributos de los campos del dataclass
+    leen y escriben directamente sobre las columnas.
+
+    La vista es valida mientras no se eliminen filas anteriores a ella en `CsvColumns`.
+    """
+    __slots__ = ("_columns", "_index", "_metadata")
+    __dataclass__: type = object
+
+    def __init__(self, columns: "CsvColumns", index: int, /) -> None:
+        self._columns = columns
+        self._index = index
+        self._metadata: MetaDataClassFile | None = None
+
+    @property
+    def __metadata__(self) -> MetaDataClassFile:
+        """Metadatos por defecto de la vista, se crean al primer acceso por cada vista."""
+        if self._metadata is None:
+            self._metadata = MetaDataClassFile()
+        return self._metadata
+
+    def todataclass(self) -> Any:
+        """Crea la instancia del dataclass con los valores de la fila."""
+        return self._columns.getrow(self._index)
+
+    def replace(self, __dataclass: Any, /) -> None:
+        """Reemplaza los valores de la fila con los campos de un dataclass u otra vista."""
+        self._columns.setrow(self._index, __dataclass)
+
+    def to_dict(self, encode_json=False) -> dict[str, Any]:
+        """Convierte la fila a diccionario, ver `DataClass.to_dict`."""
+        return self.todataclass().to_dict(encode_json)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CsvRowView):
+            other = other.todataclass()
+        return self.todataclass() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.todataclass())
+
+
+_views: dict[type, type[CsvRowView]] = {}
+
+def _column_property(name: str) -> property:
+    def getter(self: CsvRowView) -> Any:
+        return self._columns.columns[name][self._index]
+
+    def setter(self: CsvRowView, value: Any) -> None:
+        self._columns.columns[name][self._index] = value
+    return property(getter, setter)
+
+def get_row_view(cls: type, /) -> type[CsvRowView]:
+    """Devuelve la clase de las vistas de fila para el dataclass, se crea una sola vez."""
+    view = _views.get(cls)
+    if view is None:
+        namespace: dict[str, Any] = {"__slots__": (), "__dataclass__": cls}
+        for name in CsvColumns.getfieldnames(cls):
+            namespace[name] = _column_property(name)
+        view = type(cls.__name__ + "RowView", (CsvRowView,), namespace)
+        _views[cls] = view
+    return view
+
+
+class CsvColumns(Generic[T]):
+    """
+    Filas del CSV almacenadas por columnas, un listado por cada campo del dataclass.
+
+    Se comporta como el listado de filas `__csv_rows__`: admite `len`, indices, iteración,
+    `append`, `extend` y eliminación por indice, las filas se entregan como `CsvRowView`.
+    """
+    def __init__(self, cls: type[T], rows: Iterable[T] = (), /) -> None:
+        self.datacls = cls
+        self.fieldnames = CsvColumns.getfieldnames(cls)
+        self.columns: dict[str, list[Any]] = {name: [] for name in self.fieldnames}
+        self.__view = get_row_view(cls)
+        self.__length = 0
+        self.extend(rows)
+
+    @staticmethod
+    def getfieldnames(cls: type, /) -> tuple[str, ...]:
+        """Nombre de los campos del dataclass que se almacenan como columnas."""
+        return tuple(field.name for field in fields(cls)
+                     if field.init and field.name != "__metadata__")
+
+    def column(self, name: str, /) -> list[Any]:
+        """Devuelve el listado de valores de la columna, sin copiar."""
+        return self.columns[name]
+
+    def getrow(self, index: int, /) -> T:
+        """Crea la instancia del dataclass con los valores de la fila."""
+        index = self.__index(index)
+        return self.datacls(**{name: column[index] for name, column in self.columns.items()})
+
+    def setrow(self, index: int, row: Any, /) -> None:
+        """Reemplaza los valores de la fila con los campos de un dataclass u otra vista."""
+        index = self.__index(index)
+        for name, column in self.columns.items():
+            if hasattr(row, name):
+                column[index] = getattr(row, name)
+
+    def append(self, row: T, /) -> None:
+        """Añade una fila al final de las columnas."""
+        for name, column in self.columns.items():
+            column.append(getattr(row, name))
+        self.__length += 1
+
+    def extend(self, rows: Iterable[T], /) -> None:
+        """Añade varias filas al final de las columnas."""
+        for row in rows:
+            self.append(row)
+
+    def __index(self, index: int) -> int:
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError("El indice de la fila está fuera del rango de las columnas CSV.")
+        return index
+
+    def __len__(self) -> int:
+        return self.__length
+
+    @overload
+    def __getitem__(self, index: int, /) -> CsvRowView: pass
+    @overload
+    def __getitem__(self, index: slice, /) -> list[CsvRowView]: pass
+    def __getitem__(self, index: int | slice, /) -> CsvRowView | list[CsvRowView]:
+        if isinstance(index, slice):
+            return [self.__view(self, idx) for idx in range(*index.indices(self.__length))]
+        return self.__view(self, self.__index(index))
+
+    def __delitem__(self, index: int | slice, /) -> None:
+        for column in self.columns.values():
+            del column[index]
+        self.__length = len(next(iter(self.columns.values()), []))
+
+    def __iter__(self) -> Iterator[CsvRowView]:
+        view = self.__view
+        return (view(self, idx) for idx in range(self.__length))
@@ -0,0 +1,170 @@
+"""
+Decodificadores compilados por dataclass.
+
+`DataClassJsonMixin.from_dict` analiza el esquema, los tipos `Optional[...]` y los decodificadores
+globales en cada llamada. Este modulo construye una sola vez por dataclass una función que
+convierte campo por campo un diccionario en la instancia, con los mismos resultados, util para
+decodificar muchas filas de una misma estructura, por ejemplo, los archivos CSV y las respuestas
+de los servicios API.
+
+Los valores que no se pueden convertir de forma directa se delegan a `from_dict`.
+"""
+
+from typing import TypeVar, Any, Callable, get_type_hints, get_origin, get_args
+from collections.abc import Collection
+from enum import Enum
+from uuid import UUID
+from decimal import Decimal
+from datetime import datetime
+from dataclasses import fields, is_dataclass, MISSING
+from dataclasses_json import global_config as DataClassGlobalConfig
+from typing_inspect import is_union_type, is_new_type
+
+T = TypeVar("T")
+DictDecoder = Callable[[dict[str, Any]], T]
+
+_decoders: dict[type, DictDecoder] = {}
+
+class _FallbackDecoder(Exception):
+    """El valor requiere la decodificación completa de `dataclasses_json`."""
+
+def _fallback(_value: Any) -> Any:
+    raise _FallbackDecoder()
+
+def _identity(value: Any) -> Any:
+    return value
+
+def _is_optional(type_: Any) -> bool:
+    return type_ is Any or type(None) in get_args(type_)
+
+def _is_supported_generic(type_: Any) -> bool:
+    origin = get_origin(type_) or type_
+    if isinstance(origin, type) and issubclass(origin, str):
+        return False
+    is_collection = isinstance(origin, type) and issubclass(origin, Collection)
+    is_enum = isinstance(type_, type) and issubclass(type_, Enum)
+    is_generic_dataclass = is_dataclass(get_origin(type_))
+    return is_collection or _is_optional(type_) or is_union_type(type_) or is_enum \
+        or is_generic_dataclass
+
+def _compile_extended(type_: Any) -> Callable[[Any], Any]:
+    """Equivalente a la conversión de tipos básicos y extendidos de `dataclasses_json`."""
+    if not isinstance(type_, type):
+        return _identity
+    if issubclass(type_, datetime):
+        return _compile_instance(type_, _fallback)
+    if issubclass(type_, (Decimal, UUID, int, float, str, bool)):
+        return _compile_instance(type_, type_)
+    return _identity
+
+def _compile_instance(type_: type, convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def decoder(value: Any) -> Any:
+        if isinstance(value, type_):
+            return value
+        if is_dataclass(value):
+            raise _FallbackDecoder()
+        return convert(value)
+    return decoder
+
+def _compile_generic(type_: Any) -> Callable[[Any], Any]:
+    """Equivalente a la decodificación de tipos genericos: Enum, list, Optional y Union."""
+    if isinstance(type_, type) and issubclass(type_, Enum):
+        return lambda value: None if value is None else type_(value)
+    if (get_origin(type_) or type_) is list and get_args(type_):
+        decoder_item = _compile_type(get_args(type_)[0])
+        return lambda value: None if value is None else [decoder_item(i) for i in value]
+    args = get_args(type_)
+    if type_ is Any or not args:
+        return _identity
+    if _is_optional(type_) and len(args) == 2:
+        decoder_arg = _compile_type(args[0])
+        return lambda value: None if value is None else decoder_arg(value)
+    return lambda value: None if value is None else _fallback(value)
+
+def _compile_type(type_: Any) -> Callable[[Any], Any]:
+    """Equivalente a la decodificación de un tipo anidado, por ejemplo, `Optional[int]`."""
+    global_decoders = DataClassGlobalConfig.decoders
+    if type_ in global_decoders:
+        return global_decoders[type_]
+    if _is_supported_generic(type_):
+        return _compile_generic(type_)
+    if is_dataclass(type_):
+        return _compile_instance(type_, _fallback)
+    return _compile_extended(type_)
+
+def _compile_field(field_type: Any, hint: Any, metadata: dict[str, Any]) -> Callable[[Any], Any]:
+    """Equivalente a la decodificación de un campo en el primer nivel del dataclass."""
+    while is_new_type(hint):
+        hint = hint.__supertype__
+
+    decoder_override = DataClassGlobalConfig.decoders.get(field_type)
+    decoder_override = metadata.get("decoder", decoder_override)
+    if decoder_override is not None:
+        return lambda value: value if hint is type(value) else decoder_override(value)
+    if is_dataclass(hint):
+        return lambda value: value if is_dataclass(value) else _fallback(value)
+    if _is_supported_generic(hint):
+        return _compile_generic(hint)
+    return _compile_extended(hint)
+
+def _compile(cls: type[T]) -> DictDecoder[T]:
+    """Construye la función decodificadora del dataclass."""
+    if getattr(cls, "dataclass_json_config", None) is not None:
+        return cls.from_dict
+
+    hints = get_type_hints(cls)
+    decode_names: dict[str, str] = {}
+    plan: list[tuple[str, Callable[[Any], Any], bool, Any, Any]] = []
+    for field in fields(cls):
+        metadata: dict[str, Any] = field.metadata.get("dataclasses_json", {})
+        letter_case = metadata.get("letter_case")
+        if letter_case is not None:
+            decode_names[letter_case(field.name)] = field.name
+        if not field.init:
+            continue
+        decoder = _compile_field(field.type, hints[field.name], metadata)
+        plan.append((field.name, decoder, _is_optional(hints[field.name]),
+                     field.default, field.default_factory))
+
+    def decoder(kvs: dict[str, Any]) -> T:
+        if type(kvs) is not dict:
+            return cls.from_dict(kvs)
+        kvs_names = kvs
+        if decode_names:
+            kvs_names = {decode_names.get(k, k): v for k, v in kvs.items()}
+        init_kwargs = {}
+        try:
+            for name, decoder_field, is_optional, default, default_factory in plan:
+                if name in kvs_names:
+                    value = kvs_names[name]
+                elif default is not MISSING:
+                    value = default
+                elif default_factory is not MISSING:
+                    value = default_factory()
+                else:
+                    raise _FallbackDecoder()
+
+                if value is None:
+                    if not is_optional:
+                        raise _FallbackDecoder()
+                    init_kwargs[name] = None
+                else:
+                    init_kwargs[name] = decoder_field(value)
+        except _FallbackDecoder:
+            return cls.from_dict(kvs)
+        return cls(**init_kwargs)
+    return decoder
+
+def get_decoder(cls: type[T], /) -> DictDecoder[T]:
+    """
+    Devuelve la función que convierte un diccionario en una instancia del dataclass,
+    equivalente a `cls.from_dict(kvs)`. La función se construye una sola vez por dataclass.
+
+    **Nota:** los decodificadores globales `DataClassGlobalConfig.decoders` se leen al construir
+    la función, por lo cual se deben configurar antes del primer uso.
+    """
+    decoder = _decoders.get(cls)
+    if decoder is None:
+        decoder = _compile(cls)
+        _decoders[cls] = decoder
+    return decoder
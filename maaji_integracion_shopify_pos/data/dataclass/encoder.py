@@ -0,0 +1,173 @@
+"""
+Codificadores compilados por dataclass para la escritura de filas CSV y de los archivos.
+
+`dataclasses_json` codifica todo el dataclass, incluidos los metadatos `__metadata__` que luego
+se deben eliminar recorriendo de nuevo el resultado. Este modulo construye una sola vez por
+dataclass y por campos/encabezados del CSV una función que convierte la fila directamente en la
+lista de valores ordenados por los campos, con los mismos valores que se escribirían desde
+`to_dict`, y `asdict_without_metadata` que codifica en un solo recorrido omitiendo los metadatos.
+
+Las filas con valores que no se pueden convertir de forma directa, por ejemplo, un dataclass
+anidado o un listado, se delegan a `to_dict`.
+
+`asdict_without_metadata` usa funciones privadas de `dataclasses_json.core`, solo se usan con
+las versiones comprobadas `_SUPPORTED_VERSIONS`, en otro caso se codifica con `to_dict` y luego
+se eliminan los metadatos.
+"""
+
+from typing import Any, Callable, Collection, Mapping, Literal, Sequence
+from copy import deepcopy
+from enum import Enum
+from dataclasses import fields, is_dataclass
+import dataclasses_json
+from dataclasses_json import global_config as DataClassGlobalConfig, DataClassJsonMixin
+from ...utils import deep_del_key
+
+# Versiones de `dataclasses_json` en que se ha comprobado la API privada de `core`.
+_SUPPORTED_VERSIONS = ("0.6.",)
+try:
+    from dataclasses_json.core import (_user_overrides_or_exts, _encode_overrides,
+                                       _handle_undefined_parameters_safe)
+    _PRIVATE_API = getattr(dataclasses_json, "__version__", "").startswith(_SUPPORTED_VERSIONS)
+except ImportError:
+    _PRIVATE_API = False
+
+RowEncoder = Callable[[Any], list[Any]]
+_Plan = tuple[tuple[tuple[str | None, Callable[[Any], Any] | None], ...], frozenset[str], bool]
+
+_plans: dict[tuple[type, tuple[str | None, ...]], _Plan | None] = {}
+_dict_plans: dict[type, tuple[tuple[str, ...], dict[str, Any]]] = {}
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+class _FallbackEncoder(Exception):
+    """El valor requiere la codificación completa de `dataclasses_json`."""
+
+def _encode_value(value: Any) -> Any:
+    """Equivalente a la codificación de un valor sin codificador en el campo."""
+    type_value = type(value)
+    if type_value in _SCALAR_TYPES:
+        return value
+    encoder = DataClassGlobalConfig.encoders.get(type_value)
+    if encoder is not None:
+        return encoder(value)
+    if is_dataclass(value) or isinstance(value, Mapping) \
+        or (isinstance(value, Collection) and not isinstance(value, (str, bytes, Enum))):
+        raise _FallbackEncoder()
+    return value
+
+def _compile(cls: type, fieldnames: tuple[str | None, ...]) -> _Plan | None:
+    """Construye el plan de codificación de las columnas del dataclass."""
+    if getattr(cls, "dataclass_json_config", None) is not None:
+        return None
+
+    encoders: dict[str, Callable[[Any], Any] | None] = {}
+    for field in fields(cls):
+        metadata: dict[str, Any] = field.metadata.get("dataclasses_json", {})
+        if metadata.get("letter_case") is not None or metadata.get("exclude") is not None:
+            return None
+        encoder = DataClassGlobalConfig.encoders.get(field.type)
+        encoders[field.name] = metadata.get("encoder", encoder)
+
+    has_metadata = "__metadata__" in encoders
+    columns = []
+    for name in fieldnames:
+        if name == "__metadata__":
+            return None
+        columns.append((name if name in encoders else None, encoders.get(name)))
+
+    extra_fields = frozenset(encoders) - frozenset(fieldnames) - {"__metadata__"}
+    return (tuple(columns), extra_fields, has_metadata)
+
+def _dict_to_cells(data: dict[str, Any],
+                   fieldnames: Sequence[str | None],
+                   restval: Any,
+                   extrasaction: Literal["raise", "ignore"]) -> list[Any]:
+    """Equivalente a la conversión de `csv.DictWriter` de un diccionario a la fila CSV."""
+    if extrasaction == "raise":
+        wrong_fields = data.keys() - fieldnames
+        if wrong_fields:
+            raise ValueError("dict contains fields not in fieldnames: "
+                             + ", ".join([repr(x) for x in wrong_fields]))
+    return [data.get(key, restval) for key in fieldnames]
+
+def get_encoder(cls: type,
+                fieldnames: Sequence[str | None],
+                restval: Any = "",
+                extrasaction: Literal["raise", "ignore"] = "raise",
+                /) -> RowEncoder:
+    """
+    Devuelve la función que convierte una fila del dataclass en la lista de valores ordenados
+    por `fieldnames`, equivalente a escribir `row.to_dict()` con `csv.DictWriter`.
+
+    El plan de codificación se construye una sola vez por dataclass y campos.
+    """
+    fieldnames = tuple(fieldnames)
+
+    def get_plan(type_row: type) -> _Plan | None:
+        key = (type_row, fieldnames)
+        if key not in _plans:
+            # Las vistas de filas de `CsvColumns` se codifican con el plan de su dataclass.
+            _plans[key] = _compile(getattr(type_row, "__dataclass__", type_row), fieldnames)
+        return _plans[key]
+
+    plan_cls = get_plan(cls)
+
+    def encoder(row: Any) -> list[Any]:
+        plan = plan_cls if type(row) is cls else get_plan(type(row))
+        if plan is None:
+            return _dict_to_cells(row.to_dict(), fieldnames, restval, extrasaction)
+        columns, extra_fields, has_metadata = plan
+        if extrasaction == "raise":
+            is_metadata_visible = has_metadata and row.__metadata__.visible_on_file
+            if extra_fields or is_metadata_visible:
+                return _dict_to_cells(row.to_dict(), fieldnames, restval, extrasaction)
+        try:
+            cells = []
+            for name, field_encoder in columns:
+                if name is None:
+                    cells.append(restval)
+                elif field_encoder is not None:
+                    cells.append(field_encoder(getattr(row, name)))
+                else:
+                    cells.append(_encode_value(getattr(row, name)))
+        except _FallbackEncoder:
+            return _dict_to_cells(row.to_dict(), fieldnames, restval, extrasaction)
+        return cells
+    return encoder
+
+def asdict_without_metadata(obj: Any, encode_json=False) -> Any:
+    """
+    Equivalente a `DataClass.to_dict` seguido de `deep_del_key(..., "__metadata__")`, pero en un
+    solo recorrido: los campos y llaves `__metadata__` se omiten al codificar. Los campos y la
+    configuración de los codificadores se resuelven una sola vez por dataclass.
+    """
+    if not _PRIVATE_API and isinstance(obj, DataClassJsonMixin):
+        result = DataClassJsonMixin.to_dict(obj, encode_json)
+        deep_del_key(result, "__metadata__")
+        return result
+    if is_dataclass(obj):
+        type_obj = type(obj)
+        plan = _dict_plans.get(type_obj)
+        if plan is None:
+            names = tuple(field.name for field in fields(obj) if field.name != "__metadata__")
+            plan = _dict_plans[type_obj] = (names, _user_overrides_or_exts(obj))
+        names, overrides = plan
+        result = {}
+        for name in names:
+            value = getattr(obj, name)
+            if not overrides[name].encoder:
+                value = asdict_without_metadata(value, encode_json)
+            result[name] = value
+        result = _handle_undefined_parameters_safe(cls=obj, kvs=result, usage="to")
+        return _encode_overrides(result, overrides, encode_json=encode_json)
+    if isinstance(obj, Mapping):
+        result = {asdict_without_metadata(key, encode_json):
+                  asdict_without_metadata(value, encode_json) for key, value in obj.items()}
+        result.pop("__metadata__", None)
+        return result
+    if isinstance(obj, Collection) and not isinstance(obj, (str, bytes, Enum)):
+        return [asdict_without_metadata(value, encode_json) for value in obj]
+    encoder = DataClassGlobalConfig.encoders.get(type(obj))
+    if encoder is not None:
+        return encoder(obj)
+    return deepcopy(obj)
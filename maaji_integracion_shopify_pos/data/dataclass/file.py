@@ -2,16 +2,36 @@
 Utilidades abstractas para la manipulación de archivos con clases.
 """
 
+import os
 from typing import final, Any
 from pathlib import Path
-from copy import deepcopy
-from io import TextIOWrapper
+from copy import copy
+from uuid import uuid4
+from hashlib import sha256, file_digest
+from io import TextIOWrapper, StringIO
 from datetime import datetime
-from shutil import move as move_file
-from dataclasses import dataclass, field
+from shutil import move as move_file, copymode
+from dataclasses import dataclass, field, fields
 from dataclasses_json import DataClassJsonMixin as DataClass
-from maaji_integracion_shopify_pos.utils import deep_del_key
 from .metadata import MetaDataClassFile, EnumMetaDataFileStatus
+from .encoder import asdict_without_metadata
+
+# Metadatos que cambian en cada carga o escritura, se omiten en el hash del contenido.
+_VOLATILE_METADATA = ("created_at", "updated_at", "last_accessed_at", "content_hash")
+
+def _encode_text(text: str, encoding: str, /) -> bytes:
+    """Codifica el texto igual que un archivo en modo texto, con el separador de lineas del SO."""
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode(encoding)
+
+def _stat_key(full_path: Path, /) -> tuple[Path, int, int, int] | None:
+    """Ruta, fecha de modificación, tamaño e inodo del archivo, `None` si no existe."""
+    try:
+        file_stat = full_path.stat()
+    except FileNotFoundError:
+        return None
+    return (full_path, file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
 
 @dataclass
 class FileContext:
@@ -45,24 +65,29 @@ class DataClassFile(DataClass):
         """
         Actualiza los metadatos despues de un evento, por ejemplo, al guardar un archivo.
 
-        Devuelve un diccionario con los metadatos anteriores a los cambios.
+        Devuelve un diccionario con los metadatos anteriores a los cambios, una copia superficial
+        debido a que los valores son inmutables, excepto las rutas `path` que también se copian.
         """
         current_datetime = datetime.now()
-        copy_old_metadata = deepcopy(self.__metadata__.__dict__)
+        copy_old_metadata = self.__copy_metadata()
         if not self.__metadata__.created_at:
             self.__metadata__.created_at = current_datetime
         if not self.__metadata__.updated_at or force:
             self.__metadata__.updated_at = current_datetime
         return copy_old_metadata
 
+    def __copy_metadata(self) -> dict[str, Any]:
+        """Copia superficial de los metadatos, con una copia de las rutas `path`."""
+        copy_metadata = self.__metadata__.__dict__.copy()
+        copy_metadata["path"] = copy(self.__metadata__.path)
+        return copy_metadata
+
     def to_dict(self, encode_json=False) -> dict[str, Any]:
-        data_dict = super().to_dict(encode_json)
         if self.__metadata__.visible_on_file:
-            return data_dict
+            return super().to_dict(encode_json)
 
-        # los metadatos del dataclass padre sobrecriben los sub-dataclass por eso se deben eliminar.
-        deep_del_key(data_dict, "__metadata__", del_attrs=True)
-        return data_dict
+        # los metadatos del dataclass padre sobrecriben los sub-dataclass por eso se deben omitir.
+        return asdict_without_metadata(self, encode_json)
 
     @final
     def getpath(self) -> Path | None:
@@ -104,6 +129,10 @@ class DataClassFile(DataClass):
         setattr(self.__metadata__.path, status.value, path)
 
     __context = FileContext()
+    # Ruta, (mtime_ns, size, inode) y contexto de la ultima carga, ver `load_file`.
+    __load_cache = None
+    # (mtime_ns, size, inode) y hash del contenido del archivo guardado o cargado, ver `save_file`.
+    __saved_state = None
 
     # @final
     def getcontext(self) -> FileContext:
@@ -138,15 +167,21 @@ class DataClassFile(DataClass):
                   *,
                   context: FileContext | None = None,
                   skip_err=True,
-                  encoding="utf-8") -> None:
+                  encoding="utf-8",
+                  force=False) -> None:
         """
         Cargar el archivo, la función `onload_file` define el comportamiento del dataclass.
 
+        Si el archivo no ha cambiado desde la ultima carga, según la fecha de modificación,
+        el tamaño y el inodo, y se carga con el mismo contexto, no se vuelve a leer.
+
         :param context: Contexto en que se manipula el archivo.
         :type context: FileContext | None
         :param skip_err: Saltar el error que se presente, por ejemplo, `FileNotFoundError`.
         :param encoding: Codificación en que se abrirá el archivo, por defect, "utf-8".
         :type encoding: str
+        :param force: Leer el archivo aunque no haya cambiado, descarta los cambios en memoria.
+        :type force: bool
         """
         if context is None:
             context = self.getcontext()
@@ -154,12 +189,25 @@ class DataClassFile(DataClass):
         name = self.getname()
         if not path or not name:
             raise ValueError("No se ha establecido una ruta valida para leer el archivo.")
+        full_path = path / name
         try:
-            with open(path / name, encoding=encoding) as file:
+            stat_key = _stat_key(full_path)
+            if stat_key is None:
+                raise FileNotFoundError(2, "No such file or directory", str(full_path))
+            # El contexto se compara por identidad y por su representación, si se ha modificado.
+            cache_key = (stat_key, id(context), repr(context))
+            if not force and self.__load_cache == cache_key:
+                return None
+            self.__load_cache = None
+            with open(full_path, encoding=encoding) as file:
                 status_err = self.onload_file(file, context)
                 if not status_err:
                     self.metadata_update(force=False)
                     self.__metadata__.last_accessed_at = datetime.now()
+                    self.__load_cache = cache_key
+                    # El hash guardado en los metadatos visibles corresponde al archivo cargado.
+                    self.__saved_state = (stat_key, self.__metadata__.content_hash) \
+                        if self.__metadata__.visible_on_file else None
         except FileNotFoundError as err:
             err.strerror = "Archivo no encontrado para el dataclass"
             if not skip_err:
@@ -181,6 +229,36 @@ class DataClassFile(DataClass):
         """
         return 0
 
+    def __render(self, context: FileContext, encoding: str, /) -> bytes | None:
+        """
+        Escribe el archivo en memoria por medio de `onsave_file`, devuelve el contenido codificado
+        o `None` si el evento devuelve un estado de error.
+        """
+        buffer = StringIO()
+        status_err = self.onsave_file(buffer, context)
+        if status_err:
+            return None
+        return _encode_text(buffer.getvalue(), encoding)
+
+    def __is_saved(self, full_path: Path, content: bytes, content_hash: str, /) -> bool:
+        """
+        Comprueba si el archivo ya tiene el contenido, por el hash del ultimo contenido guardado o
+        cargado mientras el archivo no haya cambiado. Los archivos sin los metadatos visibles se
+        escriben tal cual, si no se conoce su hash se compara con el hash del archivo actual.
+        """
+        stat_key = _stat_key(full_path)
+        if stat_key is None:
+            return False
+        if self.__saved_state == (stat_key, content_hash):
+            return True
+        if self.__metadata__.visible_on_file or stat_key[2] != len(content):
+            return False
+        with open(full_path, "rb") as file:
+            if file_digest(file, "sha256").hexdigest() != content_hash:
+                return False
+        self.__saved_state = (stat_key, content_hash)
+        return True
+
     @final
     def save_file(self,
                   *,
@@ -190,6 +268,12 @@ class DataClassFile(DataClass):
         """
         Guarda el archivo escribiendo el texto devuelto por la función `onload_file`.
 
+        El contenido se escribe en memoria y se compara el hash sin las fechas de los metadatos
+        con el del ultimo contenido guardado, si es igual no se escribe el archivo y no se
+        actualizan los metadatos. Si cambió, se escribe en un temporal y se reemplaza de forma
+        atomica, el hash se guarda en `content_hash`. Si el evento devuelve un estado de error el
+        archivo actual no se modifica.
+
         :param context: Contexto en que se manipula el archivo.
         :type context: FileContext | None
         :param skip_err: Saltar el error que se presente, por ejemplo, `FileNotFoundError`.
@@ -203,17 +287,49 @@ class DataClassFile(DataClass):
         if not path or not name:
             raise ValueError("No se ha establecido una ruta valida para guardar el archivo.")
         path.mkdir(mode=511, parents=True, exist_ok=True)
-        copy_old_metadata = self.metadata_update()
+        full_path = path / name
+        visible_on_file = self.__metadata__.visible_on_file
+        copy_old_metadata = self.__copy_metadata()
+        try:
+            if visible_on_file:
+                for key in _VOLATILE_METADATA:
+                    setattr(self.__metadata__, key, None)
+            content = self.__render(context, encoding)
+        finally:
+            self.__metadata__.__dict__.update(copy_old_metadata)
+        if content is None:
+            return None
+        content_hash = sha256(content).hexdigest()
+        path_tmp = None
         try:
-            with open(path / name, "w", encoding=encoding) as file:
-                self.__metadata__.updated_at = datetime.now()
-                status_err = self.onsave_file(file, context)
-                if status_err:
+            if self.__is_saved(full_path, content, content_hash):
+                return None
+
+            copy_old_metadata = self.metadata_update()
+            self.__metadata__.content_hash = content_hash
+            if visible_on_file:
+                content = self.__render(context, encoding)
+                if content is None:
                     self.__metadata__.__dict__.update(copy_old_metadata)
+                    return None
+
+            path_tmp = full_path.with_name(f".{full_path.name}.{uuid4().hex[:8]}.tmp")
+            with open(path_tmp, "xb") as file:
+                file.write(content)
+            if full_path.exists():
+                copymode(full_path, path_tmp)
+            os.replace(path_tmp, full_path)
+            path_tmp = None
+            self.__load_cache = None
+            self.__saved_state = (_stat_key(full_path), content_hash)
         except FileNotFoundError as err:
+            self.__metadata__.__dict__.update(copy_old_metadata)
             err.strerror = "Archivo no encontrado para el dataclass"
             if not skip_err:
                 raise err
+        finally:
+            if path_tmp is not None:
+                path_tmp.unlink(missing_ok=True)
         return None
 
     @final
@@ -222,10 +338,13 @@ class DataClassFile(DataClass):
         if not isinstance(__dataclass, DataClass):
             raise TypeError("Se esperaba un tipo 'DataClass' como valor.")
 
-        fieldnames = self.schema().fields.keys()
-        dtcls_fieldnames = list(__dataclass.schema().fields.keys())
-        dtcls_fieldnames.remove("__metadata__")
-        new_dict = {key: __dataclass.__dict__[key] for key in fieldnames if key in dtcls_fieldnames}
+        # Los campos del esquema son los del dataclass, `schema()` construye el esquema de
+        # marshmallow en cada llamada.
+        dtcls_fieldnames = {dtcls_field.name for dtcls_field in fields(__dataclass)}
+        dtcls_fieldnames.discard("__metadata__")
+        new_dict = {key: __dataclass.__dict__[key]
+                    for key in (self_field.name for self_field in fields(self))
+                    if key in dtcls_fieldnames}
         self.__dict__.update(new_dict)
 
     @final
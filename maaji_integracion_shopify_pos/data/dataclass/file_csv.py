@@ -1,19 +1,30 @@
 """Modulo para manipulación de archivos CSV por medio de dataclasses."""
 
-from typing import (TypeVar, TypeAlias, Any, TypeGuard, Self, Iterable, Sequence,
+from typing import (TypeVar, TypeAlias, Any, TypeGuard, Self, Iterable, Iterator, Sequence,
                     Collection, Literal, Generic, Callable)
 from enum import Enum
 from io import TextIOWrapper
 from dataclasses import dataclass, field
-from csv import DictReader as CsvDictReader, DictWriter as CsvDictWriter, Dialect as _Dialect
+from csv import DictReader as CsvDictReader, writer as CsvWriter, Dialect as _Dialect
 from maaji_integracion_shopify_pos.utils import SupportsWrite
 from .file import DataClassFile, FileContext
+from .decoder import get_decoder
+from .encoder import get_encoder
+from .columns import CsvColumns
 
 T = TypeVar("T")
 _QuotingType: TypeAlias = int
 _DialectLike: TypeAlias = str | _Dialect | type[_Dialect]
 _PredicatePartialRows = dict[str, str | Any | Callable[[str | Any], bool]]
 
+def _is_row_select(row: dict[str, Any], items: Iterable[tuple[str, Any]], /) -> bool:
+    """Comprueba si la fila CSV coincide con todos los criterios de busqueda parcial."""
+    return all((v(row[k]) if callable(v) else row[k] == v for k, v in items))
+
+def _sort_predicates(items: Iterable[tuple[str, Any]], /) -> list[tuple[str, Any]]:
+    """Ordena los criterios de busqueda parcial, primero las igualdades y luego las funciones."""
+    return sorted(items, key=lambda item: callable(item[1]))
+
 class EnumDataClassFileCsvRows(Enum):
     """
     Establece el comportamiento de lectura y de escritura de las filas en los archivos CSV.
@@ -47,6 +58,7 @@ class FileCSVContext(FileContext):
         lineterminator: str = "\r\n"
         quoting: _QuotingType = 0
         strict: bool = False
+        columnar: bool = False
 
     @dataclass
     class OnSave(FileContext.OnSave):
@@ -82,15 +94,20 @@ class DataClassFileCsv(DataClassFile):
         return super().getcontext()
 
     @classmethod
-    def is_csv_rows(cls, value: Any) -> TypeGuard[list[Self]]:
+    def is_csv_rows(cls, value: Any) -> TypeGuard[list[Self] | CsvColumns[Self]]:
         """Comprueba si el parametro `value` es valido para al atributo `csv_rows`."""
+        if isinstance(value, CsvColumns):
+            return issubclass(value.datacls, cls)
         if not isinstance(value, list):
             return False
         return len(value) == 0 or all((isinstance(item, cls) for item in value))
 
     @property
-    def __csv_rows__(self) -> list[Self]:
-        """Devuelve las filas del CSV."""
+    def __csv_rows__(self) -> list[Self] | CsvColumns[Self]:
+        """
+        Devuelve las filas del CSV, un listado de instancias o el almacenamiento por columnas
+        `CsvColumns` si se cargó con el parametro `columnar` del contexto.
+        """
         return self.__csv_rows
 
     @__csv_rows__.setter
@@ -99,6 +116,25 @@ class DataClassFileCsv(DataClassFile):
             raise TypeError("No se puede asignar el valor, como filas del CSV.")
         self.__csv_rows = value
 
+    def find_rows(self, **eq: Any) -> list[Self]:
+        """
+        Busca las filas del CSV cuyos campos son iguales a los valores, los valores se comparan
+        tal como se escriben en el CSV, ver `to_csv`. Solo se codifican las columnas buscadas.
+
+        :raises KeyError: Si algún campo no es de la clase.
+        """
+        rows = self.__csv_rows__
+        if not eq:
+            return list(rows)
+        fieldnames = CsvColumns.getfieldnames(self.__class__)
+        unknown = [name for name in eq if name not in fieldnames]
+        if unknown:
+            raise KeyError("Los campos de busqueda no son de las filas CSV: "
+                           + ", ".join(repr(name) for name in unknown))
+        encoder = get_encoder(self.__class__, tuple(eq), None, "ignore")
+        values = list(eq.values())
+        return [row for row in rows if encoder(row) == values]
+
     def setrow(self, num: int = 1, /) -> None:
         """
         Establece todas los campos del dataclass con los de la fila seleccionada del CSV.
@@ -112,7 +148,10 @@ class DataClassFileCsv(DataClassFile):
             return None
         if abs(num) <= length:
             idx_row = num - 1 if num > 0 else num
-            csv_row = self.__csv_rows__[idx_row]
+            if isinstance(self.__csv_rows__, CsvColumns):
+                csv_row = self.__csv_rows__.getrow(idx_row)
+            else:
+                csv_row = self.__csv_rows__[idx_row]
             setattr(csv_row, "__metadata__", self.__metadata__)
             self.replace(csv_row)
         else:
@@ -129,52 +168,87 @@ class DataClassFileCsv(DataClassFile):
             self.__csv_rows__[idx_row].replace(self)
 
     @classmethod
-    def from_csv(cls, f: Iterable[str], context: FileCSVContext, /) -> Self:
+    def iter_csv(cls, f: Iterable[str], context: FileCSVContext, /) -> Iterator[Self]:
         """
-        Convertir el formato CSV a un listado de diccionarios.
+        Lee el formato CSV de forma perezosa, devolviendo las filas una a una ya convertidas
+        en instancias de la clase, sin cargar el archivo completo en memoria.
+
+        Los criterios de `EnumDataClassFileCsvRows.PARTIAL` se aplican durante la lectura y con
+        `EnumDataClassFileCsvRows.FIRST` la lectura se detiene en la primera fila.
+
+        :raises StopIteration: Si se esperan los campos/encabezados y el Iterable está vacío.
+        :raises TypeError: Si la lectura es parcial y no se han asignado criterios de busqueda.
         """
         params = context.onload
-        data_rows = []
+        if params.rows == EnumDataClassFileCsvRows.PARTIAL and not params.partial_rows:
+            err = "No se ha asignado un criterios en busqueda parcial de las filas CSV."
+            raise TypeError(err)
         try:
             if params.hasfields:
                 next(f) # ignorar los campos/encabezados del CSV.
-            csv_reader = CsvDictReader(f,
-                                       params.fieldnames,
-                                       params.restkey,
-                                       params.restval,
-                                       params.dialect,
-                                       delimiter=params.delimiter,
-                                       quotechar=params.quotechar,
-                                       escapechar=params.escapechar,
-                                       doublequote=params.doublequote,
-                                       skipinitialspace=params.skipinitialspace,
-                                       lineterminator=params.lineterminator,
-                                       quoting=params.quoting,
-                                       strict=params.strict)
-
-            if params.rows == EnumDataClassFileCsvRows.FIRST:
-                data_rows = [next(csv_reader)]
         except StopIteration as err:
             err.args = ("No hay filas en el Iterable CSV.",)
             raise err
+        csv_reader = CsvDictReader(f,
+                                   params.fieldnames,
+                                   params.restkey,
+                                   params.restval,
+                                   params.dialect,
+                                   delimiter=params.delimiter,
+                                   quotechar=params.quotechar,
+                                   escapechar=params.escapechar,
+                                   doublequote=params.doublequote,
+                                   skipinitialspace=params.skipinitialspace,
+                                   lineterminator=params.lineterminator,
+                                   quoting=params.quoting,
+                                   strict=params.strict)
+        return cls.__iter_csv_rows(csv_reader, params)
 
-        if params.rows == EnumDataClassFileCsvRows.ALL:
-            data_rows = list(csv_reader)
+    @classmethod
+    def __iter_csv_rows(cls,
+                        csv_reader: CsvDictReader,
+                        params: FileCSVContext.OnLoad, /) -> Iterator[Self]:
+        """Generador de las filas del CSV según el comportamiento de lectura de las filas."""
+        decoder = get_decoder(cls)
+        if params.rows == EnumDataClassFileCsvRows.FIRST:
+            for row in csv_reader:
+                yield decoder(row)
+                return
         elif params.rows == EnumDataClassFileCsvRows.PARTIAL:
-            if not params.partial_rows:
-                err = "No se ha asignado un criterios en busqueda parcial de las filas CSV."
-                raise TypeError(err)
-            items = params.partial_rows.items()
+            items = _sort_predicates(params.partial_rows.items())
             for row in csv_reader:
-                is_row_select = all((v(row[k]) if callable(v) else row[k] == v for k, v in items))
-                if is_row_select:
-                    data_rows.append(row)
+                if _is_row_select(row, items):
+                    yield decoder(row)
+        else:
+            yield from map(decoder, csv_reader)
+
+    @classmethod
+    def from_csv(cls, f: Iterable[str], context: FileCSVContext, /) -> Self:
+        """
+        Convertir el formato CSV a un listado de diccionarios.
 
-        csv_rows = [cls.from_dict(row) for row in data_rows]
+        Con el parametro `columnar` del contexto las filas se almacenan por columnas.
+        """
+        csv_rows = cls.iter_csv(f, context)
+        if context.onload.columnar:
+            csv_rows = CsvColumns(cls, csv_rows)
+        else:
+            csv_rows = list(csv_rows)
+        if not csv_rows and context.onload.rows == EnumDataClassFileCsvRows.FIRST:
+            raise StopIteration("No hay filas en el Iterable CSV.")
         instance = cls()
         instance.__csv_rows__ = csv_rows
         return instance
 
+    def iter_csv_cells(self, context: FileCSVContext, /) -> Iterator[list[Any]]:
+        """
+        Genera los valores de cada fila del CSV ordenados por los campos del contexto de guardado,
+        sin convertir cada fila a diccionario.
+        """
+        params = context.onsave
+        encoder = get_encoder(self.__class__, params.fieldnames, params.restval, params.extrasaction)
+        return map(encoder, self.__csv_rows__)
+
     def to_csv(self, f: SupportsWrite[str], context: FileCSVContext, /) -> SupportsWrite[str]:
         """
         Converte las filas del CSV de un listado de diccionarios a un texto CSV.
@@ -182,38 +256,36 @@ class DataClassFileCsv(DataClassFile):
         params = context.onsave
         if len(self.__csv_rows__) == 0:
             return f
-        csv_rows = [line.to_dict() for line in self.__csv_rows__]
-        csv_writer = CsvDictWriter(f,
-                                   params.fieldnames,
-                                   params.restval,
-                                   params.extrasaction,
-                                   params.dialect,
-                                   delimiter=params.delimiter,
-                                   quotechar=params.quotechar,
-                                   escapechar=params.escapechar,
-                                   doublequote=params.doublequote,
-                                   skipinitialspace=params.skipinitialspace,
-                                   lineterminator=params.lineterminator,
-                                   quoting=params.quoting,
-                                   strict=params.strict)
+        if params.extrasaction.lower() not in ("raise", "ignore"):
+            raise ValueError(f"extrasaction ({params.extrasaction}) must be 'raise' or 'ignore'")
+        csv_writer = CsvWriter(f,
+                               params.dialect,
+                               delimiter=params.delimiter,
+                               quotechar=params.quotechar,
+                               escapechar=params.escapechar,
+                               doublequote=params.doublequote,
+                               skipinitialspace=params.skipinitialspace,
+                               lineterminator=params.lineterminator,
+                               quoting=params.quoting,
+                               strict=params.strict)
         if params.hasfields:
-            csv_writer.writeheader()
+            csv_writer.writerow(params.fieldnames)
+        csv_cells = self.iter_csv_cells(context)
         if params.rows == EnumDataClassFileCsvRows.FIRST:
-            csv_writer.writerow(csv_rows[0])
+            csv_writer.writerow(next(csv_cells))
         elif params.rows == EnumDataClassFileCsvRows.ALL:
-            csv_writer.writerows(csv_rows)
+            csv_writer.writerows(csv_cells)
         else:
             if not params.partial_rows:
                 err = "No se ha asignado un criterios en busqueda parcial de las filas CSV."
                 raise TypeError(err)
-            items = params.partial_rows.items()
-            for row in csv_rows:
-                is_row_select = all((v(row[k]) if callable(v) else row[k] == v for k, v in items))
-                if is_row_select:
-                    csv_writer.writerow(row)
+            fieldnames = list(params.fieldnames)
+            items = _sort_predicates(params.partial_rows.items())
+            for cells in csv_cells:
+                if _is_row_select(dict(zip(fieldnames, cells)), items):
+                    csv_writer.writerow(cells)
         return f
 
-
     def onload_file(self, __file: TextIOWrapper, __context: FileContext, /) -> int:
         """
         Metodo de evento, util para definir comportamiento de la lectura de un archivo CSV
@@ -227,16 +299,22 @@ class DataClassFileCsv(DataClassFile):
         :type __context: FileContext
         """
         try:
-            new_csv_rows = list(self.__class__.from_csv(__file, __context))
-            for row, new_row in zip(self.__csv_rows__, new_csv_rows):
-                row.replace(new_row)
-            len_difer = len(new_csv_rows) - len(self.__csv_rows__)
-
-            if len_difer > 0:
-                self.__csv_rows__.extend(new_csv_rows[-len_difer:])
-            elif len_difer < 0:
-                self.__csv_rows = self.__csv_rows__[0:-len_difer]
-
+            columnar = __context.onload.columnar
+            if columnar and not isinstance(self.__csv_rows__, CsvColumns):
+                self.__csv_rows__ = CsvColumns(self.__class__)
+            elif not columnar and isinstance(self.__csv_rows__, CsvColumns):
+                self.__csv_rows__ = []
+            count_rows = 0
+            for new_row in self.__class__.iter_csv(__file, __context):
+                if count_rows < len(self.__csv_rows__):
+                    self.__csv_rows__[count_rows].replace(new_row)
+                else:
+                    self.__csv_rows__.append(new_row)
+                count_rows += 1
+            del self.__csv_rows__[count_rows:]
+
+            if count_rows == 0 and __context.onload.rows == EnumDataClassFileCsvRows.FIRST:
+                raise StopIteration()
             self.setrow()
         except StopIteration as err:
             err.args = (f"No se cargó la primera fila del archivo CSV: '{__file.name}'",)
@@ -1,11 +1,89 @@
 """Modulo para manipulación de archivos JSON por medio de dataclasses."""
 
-from typing import Any, Callable
+import os
+import pickle
+from typing import Any, Callable, get_args
+from pathlib import Path
+from hashlib import sha256
 from io import TextIOWrapper
 from json import JSONDecodeError
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields, asdict, is_dataclass, MISSING
 from .file import DataClassFile, FileContext
 
+_SNAPSHOT_VERSION = 2
+_SNAPSHOT_MAGIC = b"maaji-snapshot"
+
+_schemas: dict[type, str] = {}
+
+def _schema_fields(cls: type, seen: set[type], /) -> list[tuple[Any, ...]]:
+    """Campos del dataclass y de los dataclass anidados en los tipos: nombre, tipo y defecto."""
+    if cls in seen:
+        return []
+    seen.add(cls)
+    schema: list[tuple[Any, ...]] = [(cls.__module__, cls.__qualname__)]
+    for dtcls_field in fields(cls):
+        factory = dtcls_field.default_factory
+        schema.append((dtcls_field.name,
+                       repr(dtcls_field.type),
+                       None if dtcls_field.default is MISSING else repr(dtcls_field.default),
+                       None if factory is MISSING else getattr(factory, "__qualname__", None)))
+        types = [dtcls_field.type]
+        while types:
+            type_field = types.pop()
+            if isinstance(type_field, type) and is_dataclass(type_field):
+                schema.extend(_schema_fields(type_field, seen))
+            types.extend(get_args(type_field))
+    return schema
+
+def _schema_fingerprint(cls: type, /) -> str:
+    """Hash del esquema del dataclass, invalida las instantaneas al cambiar los campos."""
+    fingerprint = _schemas.get(cls)
+    if fingerprint is None:
+        schema = repr(_schema_fields(cls, set()))
+        fingerprint = _schemas[cls] = sha256(schema.encode()).hexdigest()
+    return fingerprint
+
+def _snapshot_path(path_json: str | Path, /) -> Path:
+    """Ruta del archivo binario de la instantanea, junto al archivo JSON."""
+    path_json = Path(path_json)
+    return path_json.with_name(f".{path_json.name}.pickle")
+
+def _snapshot_header(key: tuple[Any, ...], /) -> bytes:
+    """Encabezado en texto plano de la instantanea, con el hash de la llave."""
+    return _SNAPSHOT_MAGIC + b" " + sha256(repr(key).encode()).hexdigest().encode() + b"\n"
+
+def _load_snapshot(path_snapshot: Path, key: tuple[Any, ...], /) -> Any | None:
+    """
+    Carga la instantanea si coincide con la llave del JSON, si no es valida devuelve `None`.
+
+    Antes de decodificar el pickle se comprueba el encabezado y, excepto en Windows, que el
+    archivo pertenezca al usuario actual y que solo este lo pueda modificar.
+    """
+    try:
+        with open(path_snapshot, "rb") as file:
+            if os.name != "nt":
+                file_stat = os.fstat(file.fileno())
+                if file_stat.st_uid != os.getuid() or file_stat.st_mode & 0o022:
+                    return None
+            if file.readline() != _snapshot_header(key):
+                return None
+            return pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError,
+            TypeError, ValueError):
+        return None
+
+def _save_snapshot(path_snapshot: Path, key: tuple[Any, ...], json_config: Any, /) -> None:
+    """Guarda la instantanea de forma atomica, los errores se omiten, es solo una cache."""
+    path_tmp = path_snapshot.with_name(f"{path_snapshot.name}.{os.getpid()}.tmp")
+    try:
+        fd = os.open(path_tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "wb") as file:
+            file.write(_snapshot_header(key))
+            pickle.dump(json_config, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(path_tmp, path_snapshot)
+    except (OSError, pickle.PicklingError, AttributeError, TypeError):
+        path_tmp.unlink(missing_ok=True)
+
 @dataclass
 class FileJSONContext(FileContext):
     """Contexto para los archivos en formato JSON."""
@@ -17,6 +95,8 @@ class FileJSONContext(FileContext):
         parse_constant: Any | None = None
         infer_missing: bool = False
         kw: dict[str, Any] = field(default_factory=lambda: {})
+        # Instantanea binaria junto al JSON, evita decodificar el JSON si no ha cambiado.
+        snapshot: bool = False
 
     @dataclass
     class OnSave(FileContext.OnSave):
@@ -48,6 +128,11 @@ class DataClassFileJson(DataClassFile):
 
         Evento: al leer el archivo.
 
+        Con el parametro `snapshot` del contexto, se guarda una instantanea binaria (pickle) del
+        dataclass junto al archivo JSON, la cual se usa en lugar de decodificar el JSON mientras
+        el hash del contenido, el esquema del dataclass y los parametros de lectura coincidan.
+        El JSON sigue siendo la fuente de los datos.
+
         :param __file: StreamIO del archivo al ejecutar la función `load_file`.
         :type __file: TextIOWrapper
         :param context: Contexto del archivo en que se invoca el evento.
@@ -56,13 +141,31 @@ class DataClassFileJson(DataClassFile):
         json_text = __file.read()
         params = asdict(context.onload)
         kwargs = params.pop("kw")
+        snapshot = params.pop("snapshot")
         params.update(kwargs)
 
-        try:
-            json_config = self.__class__.from_json(json_text, **params)
-        except JSONDecodeError as err:
-            err.args = (f"Error al cargar el archivo: '{__file.name}'",)
-            raise err
+        json_config = None
+        if snapshot:
+            path_snapshot = _snapshot_path(__file.name)
+            # El texto solo cambia al cambiar los datos, `save_file` no escribe el archivo si el
+            # contenido sin las fechas de los metadatos es igual.
+            snapshot_key = (_SNAPSHOT_VERSION,
+                            self.__class__.__module__,
+                            self.__class__.__qualname__,
+                            _schema_fingerprint(self.__class__),
+                            repr(params),
+                            sha256(json_text.encode()).hexdigest())
+            json_config = _load_snapshot(path_snapshot, snapshot_key)
+            if not isinstance(json_config, self.__class__):
+                json_config = None
+        if json_config is None:
+            try:
+                json_config = self.__class__.from_json(json_text, **params)
+            except JSONDecodeError as err:
+                err.args = (f"Error al cargar el archivo: '{__file.name}'",)
+                raise err
+            if snapshot:
+                _save_snapshot(path_snapshot, snapshot_key, json_config)
         self.replace(json_config)
         self.__metadata__ = json_config.__metadata__
         return 0
@@ -58,6 +58,9 @@ class MetaDataClassFile(DataClass):
     :created_at: Timestamp en que se creó el dataclass.
     :updated_at: Timestamp en que se actualizó el dataclass.
     :last_accessed_at: Timestamp del ultimo acceso a el dataclass.
+    :refreshed_at: Timestamp de la ultima actualización de los datos desde su origen, aunque los
+        datos no hayan cambiado.
+    :content_hash: Hash del contenido del archivo sin las fechas de los metadatos.
     """
     visible_on_file: bool = False
     name: Optional[str] = None
@@ -66,3 +69,5 @@ class MetaDataClassFile(DataClass):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     last_accessed_at: Optional[datetime] = None
+    refreshed_at: Optional[datetime] = None
+    content_hash: Optional[str] = None
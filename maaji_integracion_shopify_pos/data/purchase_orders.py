@@ -2,16 +2,13 @@
 Modulo para gestionar de las ordenes de compra con estructuras.
 """
 
-from typing import Optional, Sequence, Collection, Literal, Self
-from copy import deepcopy
+from typing import Optional, Sequence, Collection, Literal, Self, Iterator, Any
 from io import TextIOWrapper
-from types import SimpleNamespace
 from datetime import datetime, date
 from dataclasses import dataclass, field
-from functools import partial as func_partial
 from marshmallow import fields
 from .dataclass import (DataClass, config, DataClassFileCsv, EnumDataClassFileCsvRows as Rows,
-                        FileCSVContext, _PredicatePartialRows)
+                        FileCSVContext, _PredicatePartialRows, get_encoder)
 from .purchase_orders_items import (DataPurchaseOrderItem, DataPurchaseOrderItemsFile,
                                     FilePurchaseOrderItemContext)
 from ..utils import SupportsWrite
@@ -128,51 +125,72 @@ class DataPurchaseOrdersFile(DataClassFileCsv, DataPurchaseOrder):
         return fieldnames
 
     @classmethod
-    def from_csv(cls, f: TextIOWrapper, context: FilePurchaseOrderContext, /) -> Self:
-        """Cargar en formato CSV, crea la instancia y la devuelve."""
+    def iter_csv(cls, f: TextIOWrapper, context: FilePurchaseOrderContext, /) -> Iterator[Self]:
+        """
+        Lee en formato CSV las ordenes de compra una a una, cada fila comparte los articulos
+        cargados del mismo archivo.
+        """
         items = DataPurchaseOrderItemsFile.from_csv(f, context.purchase_items_context)
         f.seek(0)
-        instance = super().from_csv(f, context)
-        for row in instance.__csv_rows__:
+
+        def set_purchase_items(row: Self) -> Self:
             row.purchase_items = items.__csv_rows__
-        return instance
+            return row
+        return map(set_purchase_items, super().iter_csv(f, context))
 
-    def to_csv(self,
-               f: SupportsWrite[str],
-               context: FilePurchaseOrderContext,
-               /) -> SupportsWrite[str]:
-        """Guarda la orden de compra en formato CSV."""
+    def iter_csv_cells(self, context: FilePurchaseOrderContext, /) -> Iterator[list[Any]]:
+        """
+        Genera los valores de cada fila de la orden de compra, una fila por cada articulo, los
+        campos de los articulos se identifican con el formato `purchase_items_fstr`.
+
+        Nota: Se requiere que los campos del contexto de guardado ya esten homologados,
+        ver `getfieldnames`.
+        """
+        params = context.onsave
         fstr = context.purchase_items_fstr
-        __csv_rows__ = deepcopy(self.__csv_rows__)
-        len_rows_purchase = len(self.__csv_rows__) - 1
+        fieldnames = list(params.fieldnames)
+        items_names = {fstr.format(name): name for name in DataPurchaseOrderItemsFile.schema().fields}
+        items_names.pop(fstr.format("__metadata__"), None)
+        purchase_names = set(DataPurchaseOrdersFile.schema().fields) - {"purchase_items", "__metadata__"}
+
+        wrong_fields = (purchase_names | items_names.keys()) - set(fieldnames)
+        if params.extrasaction == "raise" and wrong_fields:
+            raise ValueError("dict contains fields not in fieldnames: "
+                             + ", ".join([repr(x) for x in wrong_fields]))
+
+        is_items_columns = [name in items_names for name in fieldnames]
+        items_fieldnames = [items_names.get(name) for name in fieldnames]
+        purchase_fieldnames = [None if is_item or name == "purchase_items" else name
+                               for name, is_item in zip(fieldnames, is_items_columns)]
+        restval = params.restval
+        encoder = get_encoder(self.__class__, fieldnames, restval, params.extrasaction)
+        purchase_encoder = get_encoder(self.__class__, purchase_fieldnames, restval, "ignore")
+        items_encoder = get_encoder(DataPurchaseOrderItemsFile, items_fieldnames, restval, "ignore")
+
+        len_rows_purchase = len(self.__csv_rows__)
         for idx, purchase_item in enumerate(self.purchase_items):
-            if idx <= len_rows_purchase:
+            if idx < len_rows_purchase:
                 row_purchase = self.__csv_rows__[idx]
-                is_new_purchase = False
             else:
                 row_purchase = self.__class__()
-                is_new_purchase = True
-
-            row_purchase.purchase_items = purchase_item
-            dict_row_purchase = row_purchase.to_dict()
-            dict_items: dict = dict_row_purchase.pop("purchase_items")
-            dict_items = {fstr.format(key): value for key, value in dict_items.items()}
-            dict_row_purchase.update(dict_items)
-            # Simular un dataclass
-            row_purchase = SimpleNamespace()
-            # Obligatorio añadir el metodo to_dict
-            row_purchase.to_dict = func_partial(lambda x: x, dict_row_purchase)
-
-            if is_new_purchase:
-                self.__csv_rows__.append(row_purchase)
-            else:
-                self.__csv_rows__[idx] = row_purchase
+            cells_purchase = purchase_encoder(row_purchase)
+            cells_items = items_encoder(purchase_item)
+            yield [cell_item if is_item else cell_purchase for cell_purchase, cell_item, is_item
+                   in zip(cells_purchase, cells_items, is_items_columns)]
 
+        # Filas de la orden de compra sin articulos.
+        for row_purchase in self.__csv_rows__[len(self.purchase_items):]:
+            yield encoder(row_purchase)
+
+    def to_csv(self,
+               f: SupportsWrite[str],
+               context: FilePurchaseOrderContext,
+               /) -> SupportsWrite[str]:
+        """Guarda la orden de compra en formato CSV."""
         old_fieldnames = context.onsave.fieldnames
-        fieldnames = DataPurchaseOrdersFile.getfieldnames(context)
-        context.onsave.fieldnames = fieldnames
-        super().to_csv(f, context)
-        self.__csv_rows__ = __csv_rows__
-        context.onsave.fieldnames = old_fieldnames
+        context.onsave.fieldnames = DataPurchaseOrdersFile.getfieldnames(context)
+        try:
+            super().to_csv(f, context)
+        finally:
+            context.onsave.fieldnames = old_fieldnames
         return f
-    
\ No newline at end of file
@@ -42,3 +42,9 @@ class DataSuppliersFile(DataClassFileJson):
     maaji_co_test: list[DataSupplier] = field(default_factory=list)
     maaji_pos: list[DataSupplier] = field(default_factory=list)
     maaji_pos_outlet: list[DataSupplier] = field(default_factory=list)
+
+    # Fecha de la ultima sincronización completa con la API, ver `ApiStockyFile.update`.
+    full_updated_at: Optional[datetime] = None
+    # Fecha de inicio de la ultima sincronización exitosa de cada tienda, completa o incremental,
+    # es la marca desde la cual se consulta la siguiente sincronización incremental.
+    synced_at: dict[str, datetime] = field(default_factory=dict)
@@ -1,9 +1,10 @@
 """TODO: DOCS"""
 
-from typing import Callable
+from typing import Callable, cast
+from unicodedata import normalize, combining
 from dataclasses import dataclass, field
 from .data.dataclass import DataClass, DataClassFileJson, FileJSONContext, MetaDataClassFile
-from .utils import WORKING_DIR
+from .utils import LazyProxy, WORKING_DIR
 
 @dataclass
 class AbsFields(DataClass):
@@ -24,6 +25,11 @@ def cegidrange(codes: list[str], end: int, start=1) -> list[str]:
         depots.extend(list(map(lambda x: depot + str(x), range_num)))
     return depots
 
+def normalize_store_value(value: str, /) -> str:
+    """Normaliza el nombre o código de una tienda: sin tildes, sin mayúsculas y sin espacios."""
+    value = normalize("NFKD", value)
+    return "".join(char for char in value if not combining(char)).casefold().strip()
+
 @dataclass
 class Stores(DataClass):
     """Homologación de campos de las tiendas."""
@@ -92,6 +98,43 @@ class Stores(DataClass):
         cegid_y2_items = tuple(filter(lambda x: x.id in list_ids, self.cegid_y2))
         return Stores(shopify=shopify_items, dynamics=dynamics_items, cegid_y2=cegid_y2_items)
 
+    # Indice invertido: (tiendas indexadas, {código o nombre normalizado: tiendas agrupadas}).
+    __index = None
+
+    def reindex(self) -> None:
+        """
+        Construye el indice invertido de los códigos y nombres normalizados a las tiendas
+        agrupadas por id, ver `resolve`. Se reconstruye si se reemplazan las tiendas.
+        """
+        ids_values: dict[str, set[int]] = {}
+        for items in (self.shopify, self.dynamics, self.cegid_y2):
+            for item in items:
+                for value in (*item.codes, *item.names):
+                    ids_values.setdefault(normalize_store_value(value), set()).add(item.id)
+
+        groups: dict[frozenset[int], tuple[tuple[Stores.Fields, ...], ...]] = {}
+        index = {}
+        for value, ids in ids_values.items():
+            ids = frozenset(ids)
+            if ids not in groups:
+                groups[ids] = tuple(tuple(item for item in items if item.id in ids)
+                                    for items in (self.shopify, self.dynamics, self.cegid_y2))
+            index[value] = groups[ids]
+        self.__index = ((self.shopify, self.dynamics, self.cegid_y2), index)
+
+    def resolve(self, value: str, /) -> "Stores":
+        """
+        Busca los campos de las tiendas por código o nombre, equivalente a
+        `find(lambda fd: value in fd.codes or value in fd.names)` pero sin distinguir tildes ni
+        mayúsculas, por medio del indice invertido.
+        """
+        indexed = (self.shopify, self.dynamics, self.cegid_y2)
+        if self.__index is None or any(a is not b for a, b in zip(self.__index[0], indexed)):
+            self.reindex()
+        shopify_items, dynamics_items, cegid_y2_items = \
+            self.__index[1].get(normalize_store_value(value), ((), (), ()))
+        return Stores(shopify=shopify_items, dynamics=dynamics_items, cegid_y2=cegid_y2_items)
+
 @dataclass
 class FieldMappingFile(DataClassFileJson):
     """
@@ -102,10 +145,17 @@ class FieldMappingFile(DataClassFileJson):
 
     stores: Stores = field(default_factory=Stores)
 
-FieldMapping = FieldMappingFile()
-FieldMapping.setname("fieldsmapping.json")
-FieldMapping.setpath(WORKING_DIR)
-FieldMappingContext = FileJSONContext(onsave=FileJSONContext.OnSave(indent=4))
-FieldMapping.setcontext(FieldMappingContext)
-FieldMapping.load_file()
-FieldMapping.save_file()
+FieldMappingContext = FileJSONContext(onload=FileJSONContext.OnLoad(snapshot=True),
+                                      onsave=FileJSONContext.OnSave(indent=4))
+
+def _load_fieldmapping() -> FieldMappingFile:
+    """Carga la homologación de campos y guarda los valores por defecto, en el primer acceso."""
+    fieldmapping = FieldMappingFile()
+    fieldmapping.setname("fieldsmapping.json")
+    fieldmapping.setpath(WORKING_DIR)
+    fieldmapping.setcontext(FieldMappingContext)
+    fieldmapping.load_file()
+    fieldmapping.save_file()
+    return fieldmapping
+
+FieldMapping = cast(FieldMappingFile, LazyProxy(_load_fieldmapping))
@@ -3,7 +3,10 @@ Este archivo brinda utilidades básicas para todo el proyecto.
 """
 
 import time
-from typing import Protocol, TypeVar, Generic, Any
+from threading import Lock
+from typing import Protocol, TypeVar, Generic, Any, Callable, Iterator, SupportsIndex
+from copy import copy, deepcopy
+from weakref import ref
 from os import environ
 from pathlib import Path
 from functools import wraps
@@ -29,7 +32,7 @@ WORKING_DIR = Path(environ.get(KEY_ENV_WORKING_DIR) or DEFAULT_WORKING_DIR)
 
 if WORKING_DIR.exists() and not WORKING_DIR.is_dir():
     WORKING_DIR = DEFAULT_WORKING_DIR
-WORKING_DIR.mkdir(mode=511, parents=True, exist_ok=True)
+# El directorio se crea al guardar el primer archivo, ver `DataClassFile.save_file`.
 
 def load_dotenv(dotenv_path=WORKING_DIR / ".env", / , override=False):
     """Cargar las variables de entorno."""
@@ -95,6 +98,122 @@ class UrlParser(AbsUrlParseResult):
         return UrlParser(url_str)
 
 
+class _LazyProxyType(type):
+    """
+    Metaclase de las clases de cada proxy, las funciones que consultan el tipo del objeto, por
+    ejemplo, `dataclasses.asdict`, `dataclasses.replace` y `dataclasses.is_dataclass`, leen los
+    atributos `__dataclass_*` de la clase del objeto del proxy.
+    """
+    def __getattr__(cls, name: str) -> Any:
+        proxy = type.__getattribute__(cls, "__dict__").get("_LazyProxyType__proxy")
+        if proxy is None or not name.startswith("__dataclass_"):
+            raise AttributeError(name)
+        return getattr(type(LazyProxy.getinstance(proxy())), name)
+
+
+class LazyProxy(Generic[T], metaclass=_LazyProxyType):
+    """
+    Proxy de un objeto que se crea con la función `factory` en el primer acceso a sus atributos,
+    util para las instancias globales de los modulos que leen o escriben archivos al crearse,
+    por ejemplo, `Configuration`, asi solo se cargan los archivos que se utilizan.
+
+    Además de los atributos, se redirigen al objeto `__dict__`, los protocolos de contenedor,
+    la copia y la serialización con `pickle`, estos dos ultimos devuelven el objeto real.
+
+    >>> Configuration = LazyProxy(load_configuration)
+    >>> Configuration.sites # Se invoca `load_configuration` solo una vez.
+    """
+    __slots__ = ("_LazyProxy__factory", "_LazyProxy__instance", "_LazyProxy__lock", "__weakref__")
+
+    def __new__(cls, factory: Callable[[], T], /) -> "LazyProxy[T]":
+        # Cada proxy tiene su propia clase, ver `_LazyProxyType`.
+        proxy_cls = _LazyProxyType(cls.__name__, (cls,), {"__slots__": ()})
+        proxy = object.__new__(proxy_cls)
+        proxy_cls._LazyProxyType__proxy = ref(proxy)
+        return proxy
+
+    def __init__(self, factory: Callable[[], T], /) -> None:
+        object.__setattr__(self, "_LazyProxy__factory", factory)
+        object.__setattr__(self, "_LazyProxy__instance", None)
+        object.__setattr__(self, "_LazyProxy__lock", Lock())
+
+    @staticmethod
+    def getinstance(proxy: "LazyProxy[T]", /) -> T:
+        """Devuelve el objeto del proxy, lo crea si aún no existe."""
+        instance = object.__getattribute__(proxy, "_LazyProxy__instance")
+        if instance is None:
+            with object.__getattribute__(proxy, "_LazyProxy__lock"):
+                instance = object.__getattribute__(proxy, "_LazyProxy__instance")
+                if instance is None:
+                    instance = object.__getattribute__(proxy, "_LazyProxy__factory")()
+                    object.__setattr__(proxy, "_LazyProxy__instance", instance)
+        return instance
+
+    @staticmethod
+    def isloaded(proxy: "LazyProxy[T]", /) -> bool:
+        """Comprueba si el objeto del proxy ya se ha creado."""
+        return object.__getattribute__(proxy, "_LazyProxy__instance") is not None
+
+    @property
+    def __class__(self):
+        # Permite `isinstance` con la clase del objeto.
+        return type(LazyProxy.getinstance(self))
+
+    @property
+    def __dict__(self) -> dict[str, Any]:
+        return LazyProxy.getinstance(self).__dict__
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(LazyProxy.getinstance(self), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(LazyProxy.getinstance(self), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(LazyProxy.getinstance(self), name)
+
+    def __dir__(self):
+        return dir(LazyProxy.getinstance(self))
+
+    def __eq__(self, other: Any) -> bool:
+        return LazyProxy.getinstance(self) == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(LazyProxy.getinstance(self))
+
+    def __bool__(self) -> bool:
+        return bool(LazyProxy.getinstance(self))
+
+    def __len__(self) -> int:
+        return len(LazyProxy.getinstance(self))
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(LazyProxy.getinstance(self))
+
+    def __contains__(self, item: Any) -> bool:
+        return item in LazyProxy.getinstance(self)
+
+    def __getitem__(self, key: Any) -> Any:
+        return LazyProxy.getinstance(self)[key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        LazyProxy.getinstance(self)[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        del LazyProxy.getinstance(self)[key]
+
+    def __copy__(self) -> T:
+        return copy(LazyProxy.getinstance(self))
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> T:
+        return deepcopy(LazyProxy.getinstance(self), memo)
+
+    def __reduce_ex__(self, protocol: SupportsIndex) -> str | tuple[Any, ...]:
+        return LazyProxy.getinstance(self).__reduce_ex__(protocol)
+
+
 class SupportsWrite(Protocol, Generic[T]):
     """Tipo Protocolo para las clases con implementación de un metodo de escritura."""
     def write(self, s: T, *args, **kwargs) -> int:
@@ -79,6 +79,7 @@ class WebLocationsFile:
             self.set_stocky_id(store_key)
 
         self.driver.get(current_url)
+        self.data.__metadata__.refreshed_at = datetime.now()
         self.data.save_file()
         return None
 
@@ -89,7 +90,8 @@ class WebLocationsFile:
 
         Por defecto, desde el ultimo día de actualización.
         """
-        updated_at = self.data.__metadata__.updated_at
+        # Los archivos anteriores sin `refreshed_at` usan la fecha de la ultima escritura.
+        updated_at = self.data.__metadata__.refreshed_at or self.data.__metadata__.updated_at
         if updated_at is None:
             self.update()
         else:
@@ -55,6 +55,7 @@ class WebStockyFile:
                 continue
 
         self.driver.get(current_url)
+        self.data.__metadata__.refreshed_at = datetime.now()
         self.data.save_file()
         return None
 
@@ -65,7 +66,8 @@ class WebStockyFile:
 
         Por defecto, desde el ultimo día de actualización.
         """
-        updated_at = self.data.__metadata__.updated_at
+        # Los archivos anteriores sin `refreshed_at` usan la fecha de la ultima escritura.
+        updated_at = self.data.__metadata__.refreshed_at or self.data.__metadata__.updated_at
         if updated_at is None:
             self.update()
         else:
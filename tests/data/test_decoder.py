@@ -0,0 +1,35 @@
+import json
+from maaji_integracion_shopify_pos.data import DataPurchaseOrderItem, DataPurchaseOrder, DataLocationsFile
+from maaji_integracion_shopify_pos.data.dynamics_service import DataApiResService, DataApiServiceBills
+from maaji_integracion_shopify_pos.data.dataclass import get_decoder
+
+ROWS = [
+  {"id": "1", "sku": "SKU1", "quantity": "2", "cost_price": "1500", "bar_code": "7702781024833"},
+  {"id": "", "sku": "", "quantity": "", "cost_price": "", "updated_at": ""},
+  {},
+]
+
+def test_decoder_same_as_from_dict():
+  decoder = get_decoder(DataPurchaseOrderItem)
+  for row in ROWS:
+    assert decoder(row) == DataPurchaseOrderItem.from_dict(row)
+
+def test_decoder_empty_string_to_none():
+  row = {"id": "", "created_at": "", "expected_on": "2024-01-01", "adjustments": "", "archived": ""}
+  purchase_order = get_decoder(DataPurchaseOrder)(row)
+  assert purchase_order == DataPurchaseOrder.from_dict(row)
+  assert purchase_order.id is None
+  assert purchase_order.created_at is None
+  assert purchase_order.purchase_items == []
+
+def test_decoder_field_name_and_field_decoder():
+  data = {"$id": "1", "Success": True, "DebugMessage": json.dumps([{"tienda": "CE001"}])}
+  assert get_decoder(DataApiResService)(data) == DataApiResService.from_dict(data)
+  assert get_decoder(DataApiServiceBills)({"tienda": "CE001"}).tienda == "CE001"
+
+def test_decoder_nested_fallback():
+  data = {"maaji_pos": [{"id": 1, "name": "Tienda"}]}
+  assert get_decoder(DataLocationsFile)(data) == DataLocationsFile.from_dict(data)
+
+def test_decoder_cache():
+  assert get_decoder(DataPurchaseOrderItem) is get_decoder(DataPurchaseOrderItem)
@@ -0,0 +1,214 @@
+import io
+from maaji_integracion_shopify_pos.data import DataPurchaseOrderItemsFile, FilePurchaseOrderItemContext
+from maaji_integracion_shopify_pos.data.dataclass import EnumDataClassFileCsvRows as Rows
+
+CSV_ITEMS = """id,sku,quantity,cost_price,bar_code
+1,SKU1,2,1500,7702781024833
+2,SKU2,,2500,7702781024834
+3,SKU3,4,,7702781024835
+"""
+
+def get_context(rows=Rows.ALL, partial_rows=None):
+  context = FilePurchaseOrderItemContext()
+  context.onload.fieldnames = ["id", "sku", "quantity", "cost_price", "bar_code"]
+  context.onload.rows = rows
+  context.onload.partial_rows = partial_rows or {}
+  return context
+
+def test_iter_csv_lazy():
+  lines = iter(io.StringIO(CSV_ITEMS))
+  rows = DataPurchaseOrderItemsFile.iter_csv(lines, get_context())
+  first_row = next(rows)
+  assert first_row.sku == "SKU1"
+  assert first_row.quantity == 2
+  # Las filas restantes aún no se han leído.
+  assert next(lines).startswith("2,SKU2")
+
+def test_iter_csv_first():
+  lines = iter(io.StringIO(CSV_ITEMS))
+  rows = list(DataPurchaseOrderItemsFile.iter_csv(lines, get_context(Rows.FIRST)))
+  assert len(rows) == 1
+  assert next(lines).startswith("2,SKU2")
+
+def test_iter_csv_partial():
+  context = get_context(Rows.PARTIAL, {"sku": "SKU3", "quantity": lambda v: v == "4"})
+  rows = list(DataPurchaseOrderItemsFile.iter_csv(io.StringIO(CSV_ITEMS), context))
+  assert [row.id for row in rows] == [3]
+  assert rows[0].cost_price == ""
+
+def test_from_csv_same_as_iter_csv():
+  instance = DataPurchaseOrderItemsFile.from_csv(io.StringIO(CSV_ITEMS), get_context())
+  rows = list(DataPurchaseOrderItemsFile.iter_csv(io.StringIO(CSV_ITEMS), get_context()))
+  assert instance.__csv_rows__ == rows
+  assert instance.__csv_rows__[1].quantity is None
+
+def test_onload_file_truncate_rows(tmp_path):
+  (tmp_path / "items.csv").write_text(CSV_ITEMS, encoding="utf-8")
+  data = DataPurchaseOrderItemsFile()
+  data.setpath(tmp_path)
+  data.setname("items.csv")
+  data.setcontext(get_context())
+  data.load_file(skip_err=False)
+  assert len(data.__csv_rows__) == 3
+
+  data.setcontext(get_context(Rows.PARTIAL, {"sku": "SKU2"}))
+  data.load_file(skip_err=False)
+  assert [row.sku for row in data.__csv_rows__] == ["SKU2"]
+  assert data.sku == "SKU2"
+
+def test_to_csv_same_as_to_dict():
+  import csv
+  items = DataPurchaseOrderItemsFile.from_csv(io.StringIO(CSV_ITEMS), get_context())
+  context = FilePurchaseOrderItemContext()
+  text_csv = io.StringIO()
+  items.to_csv(text_csv, context)
+
+  text_dict = io.StringIO()
+  params = context.onsave
+  writer = csv.DictWriter(text_dict, params.fieldnames, extrasaction="ignore", lineterminator="\n")
+  writer.writeheader()
+  writer.writerows([row.to_dict() for row in items])
+  assert text_csv.getvalue() == text_dict.getvalue()
+
+def test_to_csv_extrasaction_raise():
+  import pytest
+  items = DataPurchaseOrderItemsFile.from_csv(io.StringIO(CSV_ITEMS), get_context())
+  context = FilePurchaseOrderItemContext()
+  context.onsave.fieldnames = ["sku", "quantity"]
+  context.onsave.extrasaction = "raise"
+  with pytest.raises(ValueError):
+    items.to_csv(io.StringIO(), context)
+
+def test_from_csv_columnar():
+  from maaji_integracion_shopify_pos.data.dataclass import CsvColumns
+  context = get_context()
+  context.onload.columnar = True
+  items = DataPurchaseOrderItemsFile.from_csv(io.StringIO(CSV_ITEMS), context)
+  rows = DataPurchaseOrderItemsFile.from_csv(io.StringIO(CSV_ITEMS), get_context()).__csv_rows__
+  assert isinstance(items.__csv_rows__, CsvColumns)
+  assert list(items) == rows
+  assert items.__csv_rows__.column("sku") == ["SKU1", "SKU2", "SKU3"]
+
+  items.setrow(2)
+  assert items.sku == "SKU2"
+  items.quantity = 7
+  items.flush_row()
+  assert items.__csv_rows__[1].quantity == 7
+
+  text_columnar, text_rows = io.StringIO(), io.StringIO()
+  items.to_csv(text_columnar, FilePurchaseOrderItemContext())
+  rows[1].quantity = 7
+  instance = DataPurchaseOrderItemsFile()
+  instance.__csv_rows__ = rows
+  instance.to_csv(text_rows, FilePurchaseOrderItemContext())
+  assert text_columnar.getvalue() == text_rows.getvalue()
+
+def test_find_rows():
+  import pytest
+  items = DataPurchaseOrderItemsFile.from_csv(io.StringIO(CSV_ITEMS), get_context())
+  assert [row.id for row in items.find_rows(sku="SKU2")] == [2]
+  assert [row.id for row in items.find_rows(quantity=4, sku="SKU3")] == [3]
+  assert items.find_rows(sku="SKU9") == []
+
+  items.setrow(1)
+  items.sku = "SKU2"
+  items.flush_row()
+  assert [row.id for row in items.find_rows(sku="SKU2")] == [1, 2]
+  with pytest.raises(KeyError):
+    items.find_rows(unknown="x")
+
+def test_to_csv_partial_index():
+  items = DataPurchaseOrderItemsFile.from_csv(io.StringIO(CSV_ITEMS), get_context())
+  context = FilePurchaseOrderItemContext()
+  context.onsave.rows = Rows.PARTIAL
+  context.onsave.partial_rows = {"cost_price": lambda v: v != "", "bar_code": "7702781024834"}
+  text = io.StringIO()
+  items.to_csv(text, context)
+  lines = text.getvalue().splitlines()[1:]
+  assert len(lines) == 1 and lines[0].startswith("2,SKU2,")
+
+def test_to_csv_partial_after_edit_in_place():
+  items = DataPurchaseOrderItemsFile.from_csv(io.StringIO(CSV_ITEMS), get_context())
+  assert [row.id for row in items.find_rows(sku="SKU2")] == [2]
+  items.__csv_rows__[0].sku = "SKU2"
+  context = FilePurchaseOrderItemContext()
+  context.onsave.rows = Rows.PARTIAL
+  context.onsave.partial_rows = {"sku": "SKU2"}
+  text = io.StringIO()
+  items.to_csv(text, context)
+  lines = text.getvalue().splitlines()[1:]
+  assert [line.split(",")[0] for line in lines] == ["1", "2"]
+  assert [row.id for row in items.find_rows(sku="SKU2")] == [1, 2]
+
+def test_save_file_skip_unchanged(tmp_path):
+  items = DataPurchaseOrderItemsFile.from_csv(io.StringIO(CSV_ITEMS), get_context())
+  items.setpath(tmp_path)
+  items.setname("items.csv")
+  items.setcontext(FilePurchaseOrderItemContext())
+  items.save_file(skip_err=False)
+  updated_at = items.__metadata__.updated_at
+  mtime = (tmp_path / "items.csv").stat().st_mtime_ns
+
+  items.save_file(skip_err=False)
+  assert items.__metadata__.updated_at == updated_at
+  assert (tmp_path / "items.csv").stat().st_mtime_ns == mtime
+
+  items.__csv_rows__[0].sku = "SKU9"
+  items.save_file(skip_err=False)
+  assert items.__metadata__.updated_at != updated_at
+  assert "SKU9" in (tmp_path / "items.csv").read_text(encoding="utf-8")
+  assert [path.name for path in tmp_path.iterdir()] == ["items.csv"]
+
+def test_load_file_stat_cache(tmp_path):
+  import os
+  path_items = tmp_path / "items.csv"
+  path_items.write_text(CSV_ITEMS, encoding="utf-8")
+  data = DataPurchaseOrderItemsFile()
+  data.setpath(tmp_path)
+  data.setname("items.csv")
+  data.setcontext(get_context())
+  data.load_file(skip_err=False)
+  data.__csv_rows__[0].sku = "CHANGED"
+
+  # El archivo no ha cambiado, no se vuelve a leer.
+  data.load_file(skip_err=False)
+  assert data.__csv_rows__[0].sku == "CHANGED"
+  data.load_file(skip_err=False, force=True)
+  assert data.__csv_rows__[0].sku == "SKU1"
+
+  path_items.write_text(CSV_ITEMS.replace("SKU1", "SKU0"), encoding="utf-8")
+  stat = path_items.stat()
+  os.utime(path_items, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+  data.load_file(skip_err=False)
+  assert data.__csv_rows__[0].sku == "SKU0"
+
+def test_save_file_rollback_metadata(tmp_path):
+  from dataclasses import dataclass
+
+  @dataclass
+  class FailedItemsFile(DataPurchaseOrderItemsFile):
+    def onsave_file(self, file, context):
+      super().onsave_file(file, context)
+      self.__metadata__.path.origin = None
+      return 1
+
+  items = FailedItemsFile()
+  items.__csv_rows__ = [FailedItemsFile(sku="SKU1")]
+  items.setpath(tmp_path)
+  items.setname("items.csv")
+  items.setcontext(FilePurchaseOrderItemContext())
+  items.save_file(skip_err=False)
+  assert items.__metadata__.created_at is None
+  assert items.__metadata__.updated_at is None
+  assert items.getpath() == tmp_path
+  assert list(tmp_path.iterdir()) == []
+
+def test_columnar_row_view_metadata():
+  context = get_context()
+  context.onload.columnar = True
+  items = DataPurchaseOrderItemsFile.from_csv(io.StringIO(CSV_ITEMS), context)
+  first_row, second_row = items.__csv_rows__[0], items.__csv_rows__[1]
+  first_row.__metadata__.visible_on_file = True
+  assert first_row.__metadata__.visible_on_file
+  assert not second_row.__metadata__.visible_on_file
+  assert not items.__csv_rows__[0].__metadata__.visible_on_file
@@ -0,0 +1,129 @@
+from maaji_integracion_shopify_pos.data import DataTaxType, DataTaxTypesFile
+from maaji_integracion_shopify_pos.data.dataclass import FileJSONContext
+
+def get_tax_types(tmp_path):
+  tax_types = DataTaxTypesFile()
+  tax_types.setpath(tmp_path)
+  tax_types.setname("tax_types.json")
+  tax_types.setcontext(FileJSONContext(onload=FileJSONContext.OnLoad(snapshot=True)))
+  return tax_types
+
+def test_load_file_snapshot(tmp_path, monkeypatch):
+  tax_types = get_tax_types(tmp_path)
+  tax_types.maaji_pos = [DataTaxType(id=1, name="IVA", tax_rate="19.0")]
+  tax_types.save_file(skip_err=False)
+
+  loaded = get_tax_types(tmp_path)
+  loaded.load_file(skip_err=False)
+  assert (tmp_path / ".tax_types.json.pickle").exists()
+  assert loaded.maaji_pos == tax_types.maaji_pos
+
+  with monkeypatch.context() as patch:
+    patch.setattr(DataTaxTypesFile, "from_json", None)
+    from_snapshot = get_tax_types(tmp_path)
+    from_snapshot.load_file(skip_err=False)
+  assert from_snapshot.maaji_pos == tax_types.maaji_pos
+
+  # El JSON es la fuente de los datos, la instantanea se invalida al cambiar el contenido.
+  path_json = tmp_path / "tax_types.json"
+  path_json.write_text(path_json.read_text(encoding="utf-8").replace("IVA", "IVA 19"), encoding="utf-8")
+  changed = get_tax_types(tmp_path)
+  changed.load_file(skip_err=False)
+  assert changed.maaji_pos[0].name == "IVA 19"
+
+def test_to_dict_without_metadata(tmp_path):
+  tax_types = get_tax_types(tmp_path)
+  tax_types.maaji_pos = [DataTaxType(id=1, name="IVA", tax_rate="19.0")]
+  tax_types.__metadata__.visible_on_file = False
+  data = tax_types.to_dict()
+  assert "__metadata__" not in data
+  assert data["maaji_pos"] == [DataTaxType(id=1, name="IVA", tax_rate="19.0").to_dict()]
+
+  tax_types.__metadata__.visible_on_file = True
+  assert "__metadata__" in tax_types.to_dict()
+
+def test_load_file_snapshot_schema_changed(tmp_path, monkeypatch):
+  from maaji_integracion_shopify_pos.data.dataclass import file_json
+  tax_types = get_tax_types(tmp_path)
+  tax_types.maaji_pos = [DataTaxType(id=1, name="IVA", tax_rate="19.0")]
+  tax_types.save_file(skip_err=False)
+  get_tax_types(tmp_path).load_file(skip_err=False)
+
+  # Otra versión del dataclass: la instantanea anterior no se usa.
+  loads = []
+  monkeypatch.setattr(file_json, "_schemas", {DataTaxTypesFile: "otro esquema"})
+  monkeypatch.setattr(file_json.pickle, "load", lambda file: loads.append(1))
+  loaded = get_tax_types(tmp_path)
+  loaded.load_file(skip_err=False)
+  assert loads == []
+  assert loaded.maaji_pos == tax_types.maaji_pos
+
+def test_load_file_snapshot_header(tmp_path, monkeypatch):
+  import os
+  import pickle
+  from maaji_integracion_shopify_pos.data.dataclass import file_json
+  tax_types = get_tax_types(tmp_path)
+  tax_types.save_file(skip_err=False)
+  get_tax_types(tmp_path).load_file(skip_err=False)
+  path_snapshot = tmp_path / ".tax_types.json.pickle"
+  if os.name != "nt":
+    assert path_snapshot.stat().st_mode & 0o777 == 0o600
+
+  # Sin el encabezado valido el pickle no se decodifica.
+  loads = []
+  monkeypatch.setattr(file_json.pickle, "load", lambda file: loads.append(1))
+  path_snapshot.write_bytes(pickle.dumps(DataTaxTypesFile()))
+  os.chmod(path_snapshot, 0o600)
+  get_tax_types(tmp_path).load_file(skip_err=False)
+  assert loads == []
+
+def test_asdict_without_metadata_same_as_to_dict(monkeypatch):
+  from datetime import datetime, date
+  from dataclasses_json import DataClassJsonMixin
+  from maaji_integracion_shopify_pos.config import ConfigurationFile
+  from maaji_integracion_shopify_pos.data import (DataSuppliersFile, DataSupplier,
+                                                  DataPurchaseOrdersFile, DataPurchaseOrderItemsFile)
+  from maaji_integracion_shopify_pos.data.dataclass import encoder
+  from maaji_integracion_shopify_pos.utils import deep_del_key
+
+  purchase_orders = DataPurchaseOrdersFile(id=1, invoice_date=date(2024, 1, 2),
+                                           created_at=datetime(2024, 1, 1, 8, 30))
+  purchase_orders.purchase_items = [DataPurchaseOrderItemsFile(sku="SKU1", quantity=2)]
+  purchase_orders.__csv_rows__ = [DataPurchaseOrdersFile(id=2)]
+  suppliers = DataSuppliersFile(maaji_pos=[DataSupplier(id=1, name="A")],
+                                full_updated_at=datetime(2024, 1, 1))
+  instances = [ConfigurationFile(), suppliers, purchase_orders, get_tax_types("")]
+
+  def reference(obj, encode_json):
+    result = DataClassJsonMixin.to_dict(obj, encode_json)
+    deep_del_key(result, "__metadata__")
+    return result
+
+  for private_api in (True, False):
+    monkeypatch.setattr(encoder, "_PRIVATE_API", private_api)
+    for instance in instances:
+      for encode_json in (False, True):
+        assert encoder.asdict_without_metadata(instance, encode_json) == \
+          reference(instance, encode_json)
+
+def test_save_file_visible_metadata_unchanged(tmp_path):
+  tax_types = get_tax_types(tmp_path)
+  tax_types.maaji_pos = [DataTaxType(id=1, name="IVA", tax_rate="19.0")]
+  tax_types.save_file(skip_err=False)
+  path_json = tmp_path / "tax_types.json"
+  text, stat = path_json.read_text(encoding="utf-8"), path_json.stat()
+  tax_types.save_file(skip_err=False)
+
+  # Otra ejecución: se carga y se guarda sin cambios, como la configuración al iniciar.
+  loaded = get_tax_types(tmp_path)
+  loaded.load_file(skip_err=False)
+  loaded.save_file(skip_err=False)
+  assert path_json.read_text(encoding="utf-8") == text
+  assert (path_json.stat().st_ino, path_json.stat().st_mtime_ns) == (stat.st_ino, stat.st_mtime_ns)
+  assert loaded.__metadata__.updated_at == tax_types.__metadata__.updated_at
+
+  loaded.maaji_pos[0].name = "IVA 19"
+  loaded.save_file(skip_err=False)
+  assert "IVA 19" in path_json.read_text(encoding="utf-8")
+  assert loaded.__metadata__.updated_at != tax_types.__metadata__.updated_at
+  assert loaded.__metadata__.content_hash != tax_types.__metadata__.content_hash
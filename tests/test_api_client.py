@@ -0,0 +1,82 @@
+from time import perf_counter
+from threading import Thread
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from maaji_integracion_shopify_pos.api.client import (create_session, RateLimiter, parse_retry_after,
+                                                      READ_POST_ALLOWED_METHODS)
+from maaji_integracion_shopify_pos.config import ConfigApiService
+
+class Handler(BaseHTTPRequestHandler):
+  protocol_version = "HTTP/1.1"
+  statuses = []
+  clients = []
+
+  def do_GET(self):
+    self.clients.append(self.client_address)
+    status = self.statuses.pop(0) if self.statuses else 200
+    self.send_response(status)
+    self.send_header("Content-Length", "2")
+    self.end_headers()
+    self.wfile.write(b"{}")
+
+  def do_POST(self):
+    self.rfile.read(int(self.headers.get("Content-Length", 0)))
+    self.do_GET()
+
+  def log_message(self, *args):
+    pass
+
+def test_session_retries_and_keep_alive():
+  server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+  Thread(target=server.serve_forever, daemon=True).start()
+  url = f"http://127.0.0.1:{server.server_port}/api"
+  session = create_session(ConfigApiService(max_retries=2, backoff_factor=0, backoff_jitter=0))
+  try:
+    Handler.statuses = [503, 429]
+    assert session.get(url, timeout=5).status_code == 200
+    assert session.get(url, timeout=5).status_code == 200
+    assert len(Handler.clients) == 4
+    assert len(set(Handler.clients)) == 1 # Una sola conexión reutilizada.
+
+    Handler.statuses = [500, 500, 500]
+    assert session.get(url, timeout=5).status_code == 500
+  finally:
+    session.close()
+    server.shutdown()
+
+def test_session_retries_post():
+  server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+  Thread(target=server.serve_forever, daemon=True).start()
+  url = f"http://127.0.0.1:{server.server_port}/api"
+  config = ConfigApiService(max_retries=2, backoff_factor=0, backoff_jitter=0)
+  session = create_session(config)
+  session_post = create_session(config, allowed_methods=READ_POST_ALLOWED_METHODS)
+  try:
+    # Por defecto POST no se reintenta.
+    Handler.statuses = [503]
+    assert session.post(url, json={}, timeout=5).status_code == 503
+    Handler.statuses = [503, 502]
+    assert session_post.post(url, json={}, timeout=5).status_code == 200
+    assert Handler.statuses == []
+  finally:
+    session.close()
+    session_post.close()
+    server.shutdown()
+
+def test_rate_limiter():
+  rate_limiter = RateLimiter(20, 2)
+  start = perf_counter()
+  for _ in range(6):
+    rate_limiter.acquire()
+  assert 0.18 < perf_counter() - start < 0.5 # 2 inmediatas y 4 a 20 por segundo.
+
+  assert rate_limiter.update_from_headers({"Retry-After": "0.3"}) == 0.3
+  start = perf_counter()
+  rate_limiter.acquire()
+  assert perf_counter() - start >= 0.25
+  assert rate_limiter.update_from_headers({"X-RateLimit-Remaining": "1"}) is None
+
+def test_parse_retry_after():
+  assert parse_retry_after("2") == 2
+  assert parse_retry_after(None) is None
+  assert parse_retry_after("no es fecha") is None
+  assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
@@ -0,0 +1,136 @@
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from maaji_integracion_shopify_pos.api import dynamics_service, token_cache
+from maaji_integracion_shopify_pos.data.dynamics_service import (
+  DataApiCredentials, DataApiPayload, DataApiServiceBills
+)
+from maaji_integracion_shopify_pos.config import Configuration
+
+def get_response(access_token, expires_in):
+  expires_on = (datetime.now() + expires_in).timestamp()
+  return {"token_type": "Bearer", "expires_on": str(expires_on), "not_before": str(expires_on),
+          "resource": "https://dynamics", "access_token": access_token}
+
+def test_login_service_token_cache(tmp_path, monkeypatch):
+  logins = []
+  credentials = DataApiCredentials(grant_type="client_credentials", aad_tenant="tenant",
+                                   client_id="client", client_secret="secret",
+                                   resource="https://dynamics")
+
+  def request_login(_credentials):
+    logins.append(1)
+    return get_response(f"token-{len(logins)}", timedelta(hours=1))
+
+  monkeypatch.setattr(token_cache, "WORKING_DIR", tmp_path)
+  monkeypatch.setattr(dynamics_service, "_authentications", {})
+  monkeypatch.setattr(dynamics_service, "get_credentials", lambda _env: credentials)
+  monkeypatch.setattr(dynamics_service, "request_login", request_login)
+
+  assert dynamics_service.login_service("uat").access_token == "token-1"
+  path_cache = tmp_path / token_cache.TOKEN_CACHE_NAME
+  if sys.platform != "win32":
+    assert os.stat(path_cache).st_mode & 0o777 == 0o600
+
+  # Otro proceso: sin la memoria del proceso, el token se lee del archivo.
+  monkeypatch.setattr(dynamics_service, "_authentications", {})
+  assert dynamics_service.login_service("uat").access_token == "token-1"
+  assert logins == [1]
+
+  # Token expirado en el archivo: login antes de la petición.
+  cache = token_cache.load_token_cache()
+  key, = cache
+  cache[key] = get_response("expired", timedelta(seconds=-1))
+  token_cache.save_token_cache(cache)
+  monkeypatch.setattr(dynamics_service, "_authentications", {})
+  assert dynamics_service.login_service("uat").access_token == "token-2"
+
+def test_login_service_refresh_in_background(tmp_path, monkeypatch):
+  responses = [get_response("near-expiry", timedelta(minutes=5)),
+               get_response("refreshed", timedelta(hours=1))]
+  credentials = DataApiCredentials(grant_type="client_credentials", aad_tenant="tenant",
+                                   client_id="client", client_secret="secret",
+                                   resource="https://dynamics")
+  monkeypatch.setattr(token_cache, "WORKING_DIR", tmp_path)
+  monkeypatch.setattr(dynamics_service, "_authentications", {})
+  monkeypatch.setattr(dynamics_service, "get_credentials", lambda _env: credentials)
+  monkeypatch.setattr(dynamics_service, "request_login", lambda _credentials: responses.pop(0))
+  refreshed = []
+  monkeypatch.setattr(dynamics_service, "_refresh_in_background",
+                      lambda key, creds: refreshed.append(
+                        dynamics_service._load_or_login(key, creds, dynamics_service.REFRESH_MARGIN)))
+
+  # El token vigente se devuelve sin esperar, la renovación ocurre aparte.
+  assert dynamics_service.login_service("uat").access_token == "near-expiry"
+  assert [auth.access_token for auth in refreshed] == ["refreshed"]
+  assert dynamics_service.login_service("uat").access_token == "refreshed"
+
+def get_streaming_response(body):
+  class Response:
+    status_code = 200
+    closed = False
+    def iter_content(self, chunk_size):
+      return (body[i:i + 5] for i in range(0, len(body), 5))
+    def close(self):
+      self.closed = True
+  return Response()
+
+def test_get_service_streaming(monkeypatch):
+  items = [{"tienda": "CE001", "numero_factura": "F1"}, {"tienda": "CE002"}]
+  body = json.dumps({"$id": "1", "Success": True, "DebugMessage": json.dumps(items)}).encode()
+  response = get_streaming_response(body)
+  monkeypatch.setattr(dynamics_service, "_post_service", lambda *args, **kwargs: response)
+  payload = DataApiPayload("AM", datetime(2024, 1, 1), datetime(2024, 1, 1, 12))
+  bills = dynamics_service.get_service("bills", payload, "uat")
+  assert [bill.tienda for bill in bills] == ["CE001", "CE002"]
+  assert response.closed
+
+def test_get_service_without_debug_message(monkeypatch):
+  import pytest
+  from requests import RequestException
+  payload = DataApiPayload("AM", datetime(2024, 1, 1), datetime(2024, 1, 1, 12))
+  responses = [get_streaming_response(b'{"Success": false, "ErrorMessage": "error"}')]
+  monkeypatch.setattr(dynamics_service, "_post_service", lambda *args, **kwargs: responses[-1])
+  assert dynamics_service.get_service("bills", payload, "uat") == []
+
+  responses.append(get_streaming_response(b'{"Success": false, "DebugMessage": null}'))
+  with pytest.raises(RequestException, match="DebugMessage"):
+    dynamics_service.get_service("bills", payload, "uat")
+  assert responses[-1].closed
+
+def test_split_payload():
+  start = datetime(2024, 1, 1)
+  payload = DataApiPayload("AM", start, start + timedelta(days=2, hours=12))
+  payloads = dynamics_service.split_payload(payload, timedelta(days=1))
+  assert [(p.FecIni, p.FecFin) for p in payloads] == [
+    (start, start + timedelta(days=1)),
+    (start + timedelta(days=1), start + timedelta(days=2)),
+    (start + timedelta(days=2), start + timedelta(days=2, hours=12)),
+  ]
+  assert dynamics_service.split_payload(payload, timedelta(days=3)) == [payload]
+  assert dynamics_service.split_payload(payload, timedelta(0)) == [payload]
+
+def test_get_service_windows(monkeypatch):
+  start = datetime(2024, 1, 1)
+  records = {
+    start: [DataApiServiceBills(id_integracion="1"), DataApiServiceBills(id_integracion="2"),
+            DataApiServiceBills(id_integracion="2", ean="B")],
+    start + timedelta(days=1): [DataApiServiceBills(id_integracion="2"),
+                                DataApiServiceBills(id_integracion="3")],
+    start + timedelta(days=2): [DataApiServiceBills(id_integracion="")],
+  }
+  payloads = []
+  def iter_service(service, payload, dynamics_env):
+    payloads.append(payload)
+    return iter(records[payload.FecIni])
+
+  monkeypatch.setattr(dynamics_service, "iter_service", iter_service)
+  monkeypatch.setattr(dynamics_service, "login_service", lambda env: None)
+  monkeypatch.setattr(Configuration.api_service, "dynamics_window", 86400)
+  payload = DataApiPayload("AM", start, start + timedelta(days=3))
+  bills = dynamics_service.get_service("bills", payload, "uat")
+  assert len(payloads) == 3
+  # Los repetidos de la misma ventana se mantienen, los de ventanas anteriores se omiten.
+  assert [(bill.id_integracion, bill.ean) for bill in bills] == [
+    ("1", ""), ("2", ""), ("2", "B"), ("3", ""), ("", "")]
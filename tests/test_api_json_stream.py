@@ -0,0 +1,68 @@
+import json
+import pytest
+from maaji_integracion_shopify_pos.api.json_stream import iter_array, iter_string_field
+
+ITEMS = [
+  {"tienda": "CE001", "nombre": "Caf\u00e9 \"Maaji\"", "emoji": "\U0001F600", "valor": 1500},
+  {"tienda": "CE002", "ruta": "C:\\tmp\\", "lineas": [1, 2.5, None, True]},
+  12345,
+  "texto\nlinea",
+]
+
+def chunked(text, size):
+  data = text.encode("utf-8")
+  return [data[i:i + size] for i in range(0, len(data), size)]
+
+def get_body(items):
+  return json.dumps({"$id": "1", "Success": True, "Extra": {"a": [1, "}"]},
+                    "DebugMessage": json.dumps(items)})
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+def test_iter_string_field_and_array(size):
+  body = get_body(ITEMS)
+  message = "".join(iter_string_field(chunked(body, size), "DebugMessage"))
+  assert message == json.loads(body)["DebugMessage"]
+  items = list(iter_array(iter_string_field(chunked(body, size), "DebugMessage")))
+  assert items == ITEMS
+
+def test_iter_string_field_lone_surrogate():
+  body = '{"DebugMessage": "[\\"\\\\ud83d\\", \\"a\\\\\\\\\\"]"}'
+  for size in (1, 5, 100):
+    assert list(iter_array(iter_string_field(chunked(body, size), "DebugMessage"))) == \
+      json.loads(json.loads(body)["DebugMessage"])
+
+def test_iter_string_field_missing_and_empty():
+  assert list(iter_string_field(chunked('{"Success": false}', 3), "DebugMessage")) == []
+  assert list(iter_array(chunked(" [ ] ", 1))) == []
+
+def test_iter_array_invalid():
+  with pytest.raises(json.JSONDecodeError):
+    list(iter_array(chunked('[{"a": 1}, ', 2)))
+  with pytest.raises(json.JSONDecodeError):
+    list(iter_string_field(chunked('{"DebugMessage": "abc', 2), "DebugMessage"))
+
+def test_iter_array_number_split():
+  for chunks in (["[\n ", "976", "83.", "2\n]"], ["[1", "e", "3, -0", ".7", "5]"],
+                 ["[-", "0.7e-1", " ]"], ["[12", "3", ",4]"]):
+    assert list(iter_array(chunks)) == json.loads("".join(chunks))
+
+def test_iter_array_random_chunks():
+  import random
+  rng = random.Random(24)
+  values = [0, -1, 97683.2, 1e-7, -0.75, 12345678901234567890, 3.5e+20, True, False, None,
+            "", 'a"b\\c', "ñ\U0001F600\n", [], {}, [1, [2.5, {"x": -3e2}]], {"k": "v", "n": 1.0}]
+  for _ in range(300):
+    items = [rng.choice(values) for _ in range(rng.randint(0, 12))]
+    separators = (rng.choice([",", ", ", " ,\n"]), rng.choice([":", ": "]))
+    body = get_body(items) if rng.random() < 0.5 else json.dumps(items, separators=separators)
+    text = json.loads(body)["DebugMessage"] if body.startswith("{") else body
+    data = body.encode("utf-8")
+    positions = sorted(rng.sample(range(1, len(data)), min(len(data) - 1, rng.randint(0, 30))))
+    chunks = [data[i:j] for i, j in zip([0, *positions], [*positions, len(data)])]
+    if body.startswith("{"):
+      chunks = iter_string_field(chunks, "DebugMessage")
+    assert list(iter_array(chunks)) == json.loads(text)
+
+def test_iter_string_field_null():
+  with pytest.raises(TypeError):
+    list(iter_string_field(chunked('{"Success": false, "DebugMessage": null}', 4), "DebugMessage"))
@@ -0,0 +1,154 @@
+from time import sleep, perf_counter
+from threading import Event
+from requests import RequestException
+from maaji_integracion_shopify_pos.api import stocky
+from maaji_integracion_shopify_pos.data import DataStockyFile, DataSuppliersFile, DataSupplier
+from maaji_integracion_shopify_pos.data.dataclass import FileJSONContext
+
+def test_update_stores_concurrently(tmp_path, monkeypatch):
+  def get_service(service, store_key, data, /, query=None, **kwargs):
+    sleep(0.3)
+    if store_key == "maaji_co_test":
+      raise RequestException("Tienda sin API key")
+    return [{"id": 1, "name": f"{service} {store_key}"}]
+
+  saves = []
+  suppliers = DataSuppliersFile()
+  suppliers.setpath(tmp_path)
+  suppliers.setname("suppliers.json")
+  monkeypatch.setattr(stocky, "get_service", get_service)
+  monkeypatch.setattr(suppliers, "save_file", lambda: saves.append(1))
+
+  start = perf_counter()
+  stocky.ApiStockyFile(DataStockyFile(), suppliers).update()
+  assert perf_counter() - start < 0.6
+  assert saves == [1]
+  assert suppliers.maaji_co_test == []
+  assert suppliers.maaji_pos[0].name == "suppliers maaji_pos"
+  assert suppliers.maaji_pos_outlet[0].name == "suppliers maaji_pos_outlet"
+
+def test_iter_service_pages(monkeypatch):
+  records = [{"id": number} for number in range(1, 251)]
+  queries = []
+  prefetched = Event()
+
+  def get_service(service, store_key, data, /, query=None, **kwargs):
+    queries.append(query)
+    if len(queries) == 2:
+      prefetched.set()
+    since_id = query.since_id or 0
+    return [record for record in records if record["id"] > since_id][:query.limit]
+
+  monkeypatch.setattr(stocky, "get_service", get_service)
+  iterator = stocky.iter_service("purchase_orders", "maaji_pos", DataStockyFile())
+  assert next(iterator) == {"id": 1}
+  assert prefetched.wait(5)
+  assert [query.since_id for query in queries] == [None, 100] # Siguiente pagina anticipada.
+  assert [record["id"] for record in iterator] == list(range(2, 251))
+  assert [query.since_id for query in queries] == [None, 100, 200]
+  assert {query.limit for query in queries} == {stocky.DEFAULT_PAGE_LIMIT}
+
+def test_update_incremental_merge_by_id(tmp_path, monkeypatch):
+  responses = {"maaji_pos": [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]}
+  queries = []
+
+  def get_service(service, store_key, data, /, query=None, **kwargs):
+    queries.append(query)
+    if store_key not in responses:
+      raise RequestException("Tienda sin API key")
+    return responses[store_key]
+
+  suppliers = DataSuppliersFile()
+  suppliers.setpath(tmp_path)
+  suppliers.setname("suppliers.json")
+  suppliers.setcontext(FileJSONContext())
+  monkeypatch.setattr(stocky, "get_service", get_service)
+  api_stocky = stocky.ApiStockyFile(DataStockyFile(), suppliers)
+
+  api_stocky.update(incremental=True) # Sin sincronización completa previa.
+  assert queries[-1].updated_since is None
+  assert suppliers.full_updated_at is not None
+
+  responses["maaji_pos"] = [{"id": 2, "name": "B2"}, {"id": 3, "name": "C"}]
+  updated_since = suppliers.synced_at["maaji_pos"] - stocky.INCREMENTAL_OVERLAP
+  api_stocky.update(incremental=True)
+  assert updated_since.isoformat() in [query.updated_since for query in queries[-3:]]
+  assert [(item.id, item.name) for item in suppliers.maaji_pos] == [(1, "A"), (2, "B2"), (3, "C")]
+
+  api_stocky.update()
+  assert [item.id for item in suppliers.maaji_pos] == [2, 3]
+
+def test_update_from_last_updated_at_same_data(tmp_path, monkeypatch):
+  import json
+  from datetime import datetime, timedelta
+  requests = []
+
+  def get_service(service, store_key, data, /, query=None, **kwargs):
+    requests.append(store_key)
+    return [{"id": 1, "name": "A"}]
+
+  def get_suppliers():
+    suppliers = DataSuppliersFile()
+    suppliers.setpath(tmp_path)
+    suppliers.setname("suppliers.json")
+    suppliers.setcontext(FileJSONContext())
+    suppliers.load_file()
+    return suppliers
+
+  monkeypatch.setattr(stocky, "get_service", get_service)
+  stocky.ApiStockyFile(DataStockyFile(), get_suppliers()).update_from_last_updated_at()
+  assert len(requests) == 3
+
+  # Ultima actualización de hace dos días, la respuesta trae los mismos datos.
+  path_suppliers = tmp_path / "suppliers.json"
+  data = json.loads(path_suppliers.read_text(encoding="utf-8"))
+  data["__metadata__"]["refreshed_at"] = (datetime.now() - timedelta(days=2)).isoformat()
+  path_suppliers.write_text(json.dumps(data), encoding="utf-8")
+  stocky.ApiStockyFile(DataStockyFile(), get_suppliers()).update_from_last_updated_at()
+  assert len(requests) == 6
+
+  # Otra ejecución: la actualización anterior se guardó, no se vuelve a consultar.
+  stocky.ApiStockyFile(DataStockyFile(), get_suppliers()).update_from_last_updated_at()
+  assert len(requests) == 6
+
+def test_update_incremental_empty_delta(tmp_path, monkeypatch):
+  from datetime import datetime, timedelta
+  queries = {}
+
+  def get_service(service, store_key, data, /, query=None, **kwargs):
+    queries.setdefault(store_key, []).append(query.updated_since)
+    if store_key == "maaji_co_test":
+      raise RequestException("Tienda sin API key")
+    return []
+
+  def get_api_stocky():
+    suppliers = DataSuppliersFile()
+    suppliers.setpath(tmp_path)
+    suppliers.setname("suppliers.json")
+    suppliers.setcontext(FileJSONContext())
+    suppliers.load_file()
+    return stocky.ApiStockyFile(DataStockyFile(), suppliers)
+
+  monkeypatch.setattr(stocky, "get_service", get_service)
+  api_stocky = get_api_stocky()
+  api_stocky.service.maaji_pos = [DataSupplier(id=1, name="A")]
+  api_stocky.service.full_updated_at = datetime.now() - timedelta(days=3)
+  api_stocky.service.synced_at = {"maaji_pos": datetime.now() - timedelta(days=2)}
+  api_stocky.service.save_file(skip_err=False)
+
+  # Varias ejecuciones sin cambios: la marca avanza aunque la respuesta esté vacía.
+  for _ in range(3):
+    start = datetime.now()
+    get_api_stocky().update(incremental=True)
+    synced_at = get_api_stocky().service.synced_at
+    assert synced_at["maaji_pos"] >= start
+    assert "maaji_co_test" not in synced_at # La tienda con error conserva su marca.
+  assert queries["maaji_co_test"] == [None] * 3
+  # La primera consulta de `maaji_pos_outlet` es completa, las siguientes incrementales.
+  assert queries["maaji_pos_outlet"][0] is None
+  since = [datetime.fromisoformat(value) for value in queries["maaji_pos"]]
+  assert since[0] < datetime.now() - timedelta(days=2)
+  assert all(datetime.now() - value < timedelta(minutes=6) for value in since[1:])
+  assert all(datetime.now() - datetime.fromisoformat(value) < timedelta(minutes=6)
+             for value in queries["maaji_pos_outlet"][1:])
+  assert [item.id for item in get_api_stocky().service.maaji_pos] == [1]
@@ -0,0 +1,123 @@
+from dataclasses import fields
+import pytest
+from maaji_integracion_shopify_pos.config import ConfigurationFile, Sites, splited_style_key_sites
+from maaji_integracion_shopify_pos.utils import UrlParser
+
+FORMAT_KWARGS = [
+  {},
+  {"id": "15"},
+  {"id": "15", "token_verify": "abc", "shopify_store": "maaji-pos", "aad_tenant": "tenant"},
+]
+
+def get_site_reference(configuration, key, name_action=None, /, **kwargs):
+  """`get_site` sin la tabla compilada."""
+  url_site = configuration.sites.url(key)
+  if name_action is not None:
+    url_site = url_site / configuration.sites_actions.url(key, name_action)
+  return url_site.format(**kwargs)
+
+def get_result(function, *args, **kwargs):
+  try:
+    return function(*args, **kwargs)
+  except (KeyError, IndexError, ValueError, AttributeError) as err:
+    return type(err)
+
+def get_site_cases(configuration):
+  for key in splited_style_key_sites:
+    yield key, None
+    site_actions = getattr(configuration.sites_actions, key.split(":")[0], None)
+    for site_action in fields(site_actions) if site_actions is not None else ():
+      yield key, site_action.name
+  yield "stocky", "unknown_action"
+  yield "unknown_site", None
+  yield "shopify_store:unknown_store", None
+
+def test_get_site_same_as_reference():
+  configuration = ConfigurationFile()
+  cases = list(get_site_cases(configuration))
+  assert len(cases) > 30
+  for key, name_action in cases:
+    for kwargs in FORMAT_KWARGS:
+      args = (key,) if name_action is None else (key, name_action)
+      expected = get_result(get_site_reference, configuration, *args, **kwargs)
+      result = get_result(configuration.get_site, *args, **kwargs)
+      assert result == expected, (key, name_action, kwargs)
+      if isinstance(result, tuple):
+        assert result.geturl() == expected.geturl()
+
+def test_get_site_after_replace_sites():
+  configuration = ConfigurationFile()
+  assert configuration.get_site("stocky", "login").geturl() == "https://stocky.shopifyapps.com/login"
+  configuration.sites = Sites(stocky="https://stocky.example.com")
+  assert configuration.get_site("stocky", "login").geturl() == "https://stocky.example.com/login"
+  with pytest.raises(ValueError):
+    configuration.get_site("stocky", "unknown_action")
+
+def getsite_reference(sites, url):
+  """`getsite` sin el indice de los netloc."""
+  for key in splited_style_key_sites:
+    if UrlParser(url).netloc == sites.url(key).netloc:
+      return key
+  return None
+
+SITE_URLS = [
+  ("https://stocky.shopifyapps.com/purchase_orders/1", "stocky"),
+  ("https://stocky.shopifyapps.com/api/v2/suppliers.json", "stocky"),
+  ("https://maaji-pos.myshopify.com/admin", "shopify_store:maaji_pos"),
+  ("https://artmodeuat.sandbox.operations.dynamics.com", "dynamics:uat"),
+  ("https://login.microsoftonline.com/tenant/oauth2/token", "dynamics_login"),
+  ("https://example.com/login", None),
+  ("https://stocky.shopifyapps.com:8443/login", None),
+  ("https://www.stocky.shopifyapps.com/login", None),
+  ("https://sandbox.operations.dynamics.com", None),
+  ("https://admin.shopify.com.example.com", None),
+  ("", None),
+]
+
+def test_getsite_and_is_site():
+  sites = Sites()
+  for url, key in SITE_URLS:
+    assert sites.getsite(url) == key == getsite_reference(sites, url), url
+    for site_key in splited_style_key_sites:
+      assert sites.is_site(site_key, url) == (UrlParser(url).netloc == sites.url(site_key).netloc)
+  assert sites.is_site("stocky", "https://stocky.shopifyapps.com/login")
+  assert not sites.is_site("stocky_api", "https://stocky.shopifyapps.com:443/login")
+
+def test_getsite_port_and_reindex():
+  sites = Sites(stocky="https://stocky.local:8080")
+  assert sites.getsite("https://stocky.local:8080/login") == "stocky"
+  assert sites.getsite("https://stocky.local/login") is None
+  assert sites.getsite("https://stocky.shopifyapps.com/api/v2") == "stocky_api"
+
+  # El indice se reconstruye al cambiar una URL.
+  sites.stocky = "https://stocky.example.com"
+  assert sites.getsite("https://stocky.local:8080/login") is None
+  assert sites.getsite("https://stocky.example.com/login") == "stocky"
+  sites.shopify_store.maaji_pos = "https://maaji-pos-2.myshopify.com"
+  assert sites.getsite("https://maaji-pos-2.myshopify.com") == "shopify_store:maaji_pos"
+  assert sites.is_site("shopify_store:maaji_pos", "https://maaji-pos-2.myshopify.com/admin")
+
+def test_getsite_index_invalidation(monkeypatch):
+  sites = Sites()
+  assert sites.getsite("https://stocky.shopifyapps.com") == "stocky"
+  values = []
+  site_value = Sites._Sites__site_value
+
+  def count_site_value(self, key):
+    values.append(key)
+    return site_value(self, key)
+
+  monkeypatch.setattr(Sites, "_Sites__site_value", count_site_value)
+
+  # Sin asignaciones el indice no se reconstruye.
+  for url, key in SITE_URLS:
+    assert sites.getsite(url) == key
+    assert sites.is_site("stocky", url) == (key == "stocky")
+  assert values == []
+
+  sites.shopify_store = Sites.ShopifyStore(maaji_pos="https://maaji-pos-3.myshopify.com")
+  assert sites.getsite("https://maaji-pos-3.myshopify.com") == "shopify_store:maaji_pos"
+  assert len(values) == len(splited_style_key_sites)
+  sites.dynamics.uat = "https://uat.example.com"
+  assert sites.is_site("dynamics:uat", "https://uat.example.com/data")
+  assert len(values) == 2 * len(splited_style_key_sites)
@@ -0,0 +1,25 @@
+from types import SimpleNamespace
+from maaji_integracion_shopify_pos.controllers import dynamics_service
+from maaji_integracion_shopify_pos.data import DataLocation, dynamics_service as Dynamics
+from maaji_integracion_shopify_pos.fieldsmapping import FieldMappingFile
+
+def get_bill(numero_factura, tienda):
+  return Dynamics.DataApiServiceBills(numero_factura=numero_factura, fecha_factura="01/31/2025",
+                                      tienda=tienda, proveedor="900911000", ean="770",
+                                      cantidad="1", costo_compra="1,000", moneda="COP")
+
+def test_bills_to_purchase_orders_resolve_stores_once(monkeypatch):
+  calls = []
+  location = DataLocation(id=1, name="MAAJI MONTERIA")
+  web_locations = SimpleNamespace(data=SimpleNamespace(maaji_pos=[location]),
+                                  update_from_last_updated_at=lambda: calls.append(1))
+  monkeypatch.setattr(dynamics_service, "get_weblocations", lambda: web_locations)
+  monkeypatch.setattr(dynamics_service, "FieldMapping", FieldMappingFile())
+
+  bills = [get_bill(f"FEV{number}", "MAAJI MONTERIA") for number in range(20)]
+  bills.append(get_bill("FEV99", "TIENDA NO HOMOLOGADA"))
+  purchase_orders = dynamics_service.bills_to_purchase_orders(bills, "maaji_pos")
+
+  assert len(purchase_orders) == 20
+  assert {order.shopify_receive_location_id for order in purchase_orders} == {1}
+  assert calls == [1]
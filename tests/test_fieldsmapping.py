@@ -0,0 +1,15 @@
+from maaji_integracion_shopify_pos.fieldsmapping import Stores
+
+def test_stores_resolve_same_as_find():
+  stores = Stores()
+  for value in ["MAAJI MONTERIA", "CE605", "608", "ZN", "no existe"]:
+    found = stores.find(lambda fd: value in fd.codes or value in fd.names)
+    assert stores.resolve(value) == found
+
+def test_stores_resolve_normalized():
+  stores = Stores()
+  assert stores.resolve(" maaji montería ") == stores.resolve("MAAJI MONTERIA")
+  assert [item.id for item in stores.resolve("ce001").cegid_y2] == [10] * 11
+
+  stores.shopify = (Stores.Fields(id=4, names=["Nueva Montería"]),)
+  assert stores.resolve("nueva monteria").shopify == stores.shopify
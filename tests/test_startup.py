@@ -0,0 +1,125 @@
+import os
+import json
+import sys
+import subprocess
+from maaji_integracion_shopify_pos.utils import LazyProxy, KEY_ENV_WORKING_DIR
+
+def run_python(code, working_dir):
+  env = os.environ | {KEY_ENV_WORKING_DIR: str(working_dir)}
+  result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True,
+                          text=True, check=True)
+  return result.stdout
+
+def test_lazy_proxy():
+  calls = []
+
+  def factory():
+    calls.append(1)
+    return {"key": "value"}
+
+  proxy = LazyProxy(factory)
+  assert not LazyProxy.isloaded(proxy)
+  assert proxy.get("key") == "value"
+  assert isinstance(proxy, dict)
+  assert proxy == {"key": "value"}
+  assert LazyProxy.isloaded(proxy)
+  assert calls == [1]
+  assert proxy["key"] == "value"
+  assert len(proxy) == 1 and list(proxy) == ["key"] and "key" in proxy
+
+def test_lazy_proxy_dataclass():
+  import copy
+  import pickle
+  import dataclasses
+  from maaji_integracion_shopify_pos.data import DataTaxType, DataTaxTypesFile
+
+  tax_types = DataTaxTypesFile(maaji_pos=[DataTaxType(id=1, name="IVA")])
+  proxy = LazyProxy(lambda: tax_types)
+  assert dataclasses.is_dataclass(proxy)
+  assert dataclasses.asdict(proxy) == dataclasses.asdict(tax_types)
+  assert dataclasses.replace(proxy, maaji_pos=[]).maaji_pos == []
+  assert proxy.__dict__ is tax_types.__dict__
+  for other in (copy.copy(proxy), copy.deepcopy(proxy), pickle.loads(pickle.dumps(proxy))):
+    assert type(other) is DataTaxTypesFile
+    assert other.maaji_pos == tax_types.maaji_pos
+  assert copy.deepcopy(proxy).maaji_pos[0] is not tax_types.maaji_pos[0]
+
+  replaced = DataTaxTypesFile()
+  replaced.replace(proxy)
+  assert replaced.maaji_pos == tax_types.maaji_pos
+
+def test_import_without_file_io(tmp_path):
+  working_dir = tmp_path / "working_dir"
+  run_python("import maaji_integracion_shopify_pos.config, maaji_integracion_shopify_pos.fieldsmapping, "
+             "maaji_integracion_shopify_pos.controllers.locations, "
+             "maaji_integracion_shopify_pos.controllers.stocky", working_dir)
+  assert not working_dir.exists()
+
+  run_python("from maaji_integracion_shopify_pos.config import Configuration; Configuration.sites",
+             working_dir)
+  assert [path.name for path in working_dir.iterdir()] == ["configuration.json"]
+
+def test_cli_without_selenium(tmp_path):
+  modules = run_python("import sys\n"
+                       "from maaji_integracion_shopify_pos.cli import cli\n"
+                       "cli(['clear', 'data-cache'], standalone_mode=False)\n"
+                       "print('selenium' in sys.modules, 'webdriver_manager' in sys.modules)",
+                       tmp_path)
+  assert modules.split() == ["False", "False"]
+
+def test_parse_importtime():
+  from maaji_integracion_shopify_pos.commands.diagnose import parse_importtime
+  text = ("import time: self [us] | cumulative | imported package\n"
+          "import time:       120 |        120 |   json.decoder\n"
+          "import time:         5 |          5 |   json.scanner\n"
+          "import time:       300 |        425 | json\n"
+          "import time:        50 |         50 | site\n")
+  imports = parse_importtime(text, min_us=10)
+  assert [node["module"] for node in imports] == ["json", "site"]
+  assert imports[0]["cumulative_us"] == 425
+  assert [node["module"] for node in imports[0]["imports"]] == ["json.decoder"]
+
+def test_diagnose_startup(tmp_path):
+  output = tmp_path / "startup.json"
+  working_dir = tmp_path / "working_dir"
+  run_python("from maaji_integracion_shopify_pos.config import Configuration; Configuration.sites",
+             working_dir)
+  configuration = (working_dir / "configuration.json").read_text(encoding="utf-8")
+  run_python("from maaji_integracion_shopify_pos.cli import cli\n"
+             f"cli(['diagnose', 'startup', '-o', {str(output)!r}], standalone_mode=False)",
+             working_dir)
+  report = json.loads(output.read_text(encoding="utf-8"))
+  assert report["imports"][-1]["module"] == "maaji_integracion_shopify_pos.cli"
+  effects = {effect["name"]: effect for effect in report["side_effects"]}
+  assert set(effects) >= {"utils.load_dotenv", "config.Configuration"}
+  assert effects["utils.load_dotenv"]["calls"][0]["file"] == ".env"
+  # La sonda no crea ni modifica los archivos de `WORKING_DIR`.
+  assert [path.name for path in working_dir.iterdir()] == ["configuration.json"]
+  assert (working_dir / "configuration.json").read_text(encoding="utf-8") == configuration
+
+SNAPSHOT_CODE = """
+import json
+from maaji_integracion_shopify_pos import config, fieldsmapping
+calls = []
+for cls in (config.ConfigurationFile, fieldsmapping.FieldMappingFile):
+  def from_json(cls, *args, __from_json=cls.from_json.__func__, **kwargs):
+    calls.append(cls.__name__)
+    return __from_json(cls, *args, **kwargs)
+  cls.from_json = classmethod(from_json)
+config.Configuration.sites
+fieldsmapping.FieldMapping.stores
+print(json.dumps(calls))
+"""
+
+def test_startup_snapshot_between_processes(tmp_path):
+  run_python(SNAPSHOT_CODE, tmp_path) # Crea los archivos con los valores por defecto.
+  files = {path.name: path.read_bytes() for path in tmp_path.glob("*.json")}
+  assert set(files) == {"configuration.json", "fieldsmapping.json"}
+
+  assert json.loads(run_python(SNAPSHOT_CODE, tmp_path)) == ["ConfigurationFile",
+                                                             "FieldMappingFile"]
+  assert (tmp_path / ".configuration.json.pickle").exists()
+  assert (tmp_path / ".fieldsmapping.json.pickle").exists()
+  # La siguiente ejecución usa las instantaneas, los JSON no se vuelven a escribir.
+  assert json.loads(run_python(SNAPSHOT_CODE, tmp_path)) == []
+  assert {path.name: path.read_bytes() for path in tmp_path.glob("*.json")} == files